@@ -0,0 +1,90 @@
+"""
+Récupération concurrente des emails de plusieurs comptes
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import ACCOUNTS, FETCH_MAX_WORKERS, FETCH_QUEUE_SIZE
+from gmail_handler import fetch_gmail_emails
+from outlook_handler import fetch_outlook_emails
+
+FETCHERS = {
+    'gmail': fetch_gmail_emails,
+    'outlook': fetch_outlook_emails,
+}
+
+# Marqueur de fin de la file d'un compte
+_DONE = object()
+
+
+def _put(out_queue, item, stop):
+    """Ajoute un élément à la file en abandonnant si le consommateur s'est arrêté"""
+    while not stop.is_set():
+        try:
+            out_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _fetch_account(account, out_queue, stop, timings):
+    """Récupère les emails d'un compte dans sa propre file (exécuté dans un thread)"""
+    start = time.perf_counter()
+    waited = 0.0
+    count = 0
+
+    try:
+        fetcher = FETCHERS.get(account['type'])
+        if fetcher is None:
+            print(f"   ⚠️ Type de compte non supporté: {account['type']}")
+            return
+
+        for email in fetcher(account):
+            put_start = time.perf_counter()
+            if not _put(out_queue, email, stop):
+                return
+            waited += time.perf_counter() - put_start
+            count += 1
+
+    finally:
+        # Le temps passé à attendre le consommateur n'est pas du temps de récupération
+        timings[account['name']] = (time.perf_counter() - start - waited, count)
+        _put(out_queue, _DONE, stop)
+
+
+def fetch_all_accounts(accounts=None, max_workers=FETCH_MAX_WORKERS):
+    """Récupère les emails de tous les comptes en parallèle.
+
+    Les emails sont renvoyés au fil de l'eau, dans l'ordre de `accounts`
+    (puis dans l'ordre du fetcher pour chaque compte), pour que la
+    numérotation reste identique d'une exécution à l'autre.
+    """
+    accounts = ACCOUNTS if accounts is None else accounts
+    queues = [queue.Queue(maxsize=FETCH_QUEUE_SIZE) for _ in accounts]
+    stop = threading.Event()
+    timings = {}
+
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    try:
+        for account, account_queue in zip(accounts, queues):
+            executor.submit(_fetch_account, account, account_queue, stop, timings)
+
+        for account_queue in queues:
+            while True:
+                item = account_queue.get()
+                if item is _DONE:
+                    break
+                yield item
+    finally:
+        stop.set()
+        # Les comptes pas encore commencés ne sont pas récupérés (ni connectés)
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    print("\n⏱️  Temps de récupération par compte:")
+    for account in accounts:
+        elapsed, count = timings.get(account['name'], (0.0, 0))
+        print(f"   [{account['name']}] {elapsed:.2f}s ({count} emails)")
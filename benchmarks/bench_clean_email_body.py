@@ -0,0 +1,104 @@
+"""
+Benchmark : clean_email_body (conversion HTML en une passe) contre l'ancienne
+version à base d'expressions régulières
+
+Usage : python benchmarks/bench_clean_email_body.py
+"""
+
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from filters import FOOTER_PATTERNS, clean_email_body
+
+
+def legacy_clean_email_body(body):
+    """Ancienne implémentation (environ 25 passes re.sub sur tout le corps)"""
+    if not body:
+        return "(Aucun contenu disponible)"
+
+    clean = re.sub(r'<style[^>]*>.*?</style>', '', body, flags=re.DOTALL | re.IGNORECASE)
+    clean = re.sub(r'<script[^>]*>.*?</script>', '', clean, flags=re.DOTALL | re.IGNORECASE)
+    clean = re.sub(r'<head[^>]*>.*?</head>', '', clean, flags=re.DOTALL | re.IGNORECASE)
+    clean = re.sub(r'<!--.*?-->', '', clean, flags=re.DOTALL)
+    clean = re.sub(r'\s+style="[^"]*"', '', clean, flags=re.IGNORECASE)
+    clean = re.sub(r'\s+class="[^"]*"', '', clean, flags=re.IGNORECASE)
+    clean = re.sub(r'<br\s*/?>', '\n', clean, flags=re.IGNORECASE)
+    clean = re.sub(r'</p>', '\n\n', clean, flags=re.IGNORECASE)
+    clean = re.sub(r'</div>', '\n', clean, flags=re.IGNORECASE)
+    clean = re.sub(r'</tr>', '\n', clean, flags=re.IGNORECASE)
+    clean = re.sub(r'</li>', '\n', clean, flags=re.IGNORECASE)
+    clean = re.sub(r'<li[^>]*>', '  • ', clean, flags=re.IGNORECASE)
+    clean = re.sub(r'<h[1-6][^>]*>', '\n\n▶ ', clean, flags=re.IGNORECASE)
+    clean = re.sub(r'</h[1-6]>', '\n', clean, flags=re.IGNORECASE)
+    clean = re.sub(r'<[^>]+>', ' ', clean)
+
+    html_entities = {
+        '&nbsp;': ' ', '&amp;': '&', '&lt;': '<', '&gt;': '>',
+        '&quot;': '"', '&#39;': "'", '&apos;': "'",
+        '&euro;': '€', '&copy;': '©', '&reg;': '®',
+        '&#160;': ' ', '&#8217;': "'", '&#8220;': '"', '&#8221;': '"',
+        '&rsquo;': "'", '&lsquo;': "'", '&rdquo;': '"', '&ldquo;': '"',
+        '&ndash;': '–', '&mdash;': '—', '&bull;': '•',
+    }
+    for entity, char in html_entities.items():
+        clean = clean.replace(entity, char)
+    clean = re.sub(r'&#(\d+);', lambda m: chr(int(m.group(1))) if int(m.group(1)) < 65536 else '', clean)
+
+    clean = re.sub(r'[ \t]+', ' ', clean)
+    clean = re.sub(r'\n[ \t]+', '\n', clean)
+    clean = re.sub(r'[ \t]+\n', '\n', clean)
+    clean = re.sub(r'\n{3,}', '\n\n', clean)
+
+    for pattern in FOOTER_PATTERNS:
+        clean = re.sub(pattern, '', clean, flags=re.IGNORECASE | re.DOTALL)
+
+    clean = clean.strip()
+    if len(clean) > 3000:
+        clean = clean[:3000] + "\n\n[... contenu tronqué ...]"
+    return clean if clean else "(Contenu vide après nettoyage)"
+
+
+def marketing_html(size_kb, seed=0):
+    """Email marketing HTML typique : styles, tableaux imbriqués, entités, liens"""
+    rng = random.Random(seed)
+    words = ["offre", "exclusive", "découvrez", "nouveauté", "collection", "livraison",
+             "gratuite", "&eacute;t&eacute;", "&nbsp;", "&amp;", "promo", "-30%", "&#8217;"]
+    parts = ['<html><head><title>Newsletter</title><style>',
+             '.btn{font-size:14px;color:#fff} ' * 50, '</style></head><body>']
+    while sum(len(p) for p in parts) < size_kb * 1024:
+        text = ' '.join(rng.choice(words) for _ in range(rng.randint(5, 30)))
+        parts.append(
+            f'<table class="row" style="width:100%"><tr><td style="padding:10px">'
+            f'<div class="c"><h2>Titre</h2><p>{text}</p><!-- tracking -->'
+            f'<a href="https://shop.example.com/p/{rng.randint(1, 9999)}?utm_source=nl">Voir</a>'
+            f'<ul><li>{text}</li></ul><br/></div></td></tr></table>'
+        )
+    parts.append('<p>Commercial Register: 12345</p></body></html>')
+    return ''.join(parts)
+
+
+def bench(func, body, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(body)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    print(f"{'Taille':>8} | {'regex (ms)':>11} | {'1 passe (ms)':>12} | {'gain':>6}")
+    print("-" * 49)
+    for size_kb in (5, 50, 200, 500):
+        body = marketing_html(size_kb)
+        repeat = max(3, 200 // size_kb)
+        legacy = bench(legacy_clean_email_body, body, repeat)
+        current = bench(clean_email_body, body, repeat)
+        print(f"{size_kb:>6}KB | {legacy * 1000:>11.2f} | {current * 1000:>12.2f} | {legacy / current:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
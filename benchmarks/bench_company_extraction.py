@@ -0,0 +1,67 @@
+"""
+Benchmark : extraction du nom de l'entreprise sur des textes construits pour
+provoquer du retour arrière, contre les anciennes expressions régulières
+
+Le temps par caractère doit rester constant quand la taille du texte double.
+
+Usage : python benchmarks/bench_company_extraction.py
+"""
+
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from company import COMPANY_PATTERNS
+
+LEGACY_PATTERNS = [
+    r'(?:chez|at|@)\s+([A-Z][A-Za-z\s&]+?)(?:\s+recrute|\s+recherche|\.|\,)',
+    r'([A-Z][A-Za-z\s&]+?)\s+recrute',
+]
+
+# Au-delà, l'ancienne version prend plusieurs secondes par texte
+LEGACY_MAX_CHARS = 16000
+
+# Textes sans fin de nom d'entreprise : chaque position de départ échoue
+ADVERSARIAL_INPUTS = {
+    'mots en majuscules': lambda n: ('Acme ' * (n // 5 + 1))[:n],
+    'une seule majuscule': lambda n: 'A' * n,
+    'chez + majuscules': lambda n: ('chez Acme Big Corp ' * (n // 19 + 1))[:n],
+    'esperluettes': lambda n: ('A & ' * (n // 4 + 1))[:n],
+}
+
+
+def find_company(company_res, text):
+    for company_re in company_res:
+        match = company_re.search(text)
+        if match:
+            return match.group(1).strip()
+    return None
+
+
+def bench(company_res, text, repeat=3):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        find_company(company_res, text)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    legacy_res = [re.compile(pattern) for pattern in LEGACY_PATTERNS]
+    current_res = [re.compile(pattern) for pattern in COMPANY_PATTERNS]
+
+    for name, make_text in ADVERSARIAL_INPUTS.items():
+        print(f"\n{name}")
+        print(f"{'Taille':>8} | {'ancien (ms)':>12} | {'borné (ms)':>11} | {'borné (µs/car.)':>15}")
+        print("-" * 56)
+        for size in (1000, 4000, 16000, 64000, 256000):
+            text = make_text(size)
+            legacy = f"{bench(legacy_res, text) * 1000:>12.2f}" if size <= LEGACY_MAX_CHARS else f"{'-':>12}"
+            current = bench(current_res, text)
+            print(f"{size:>8} | {legacy} | {current * 1000:>11.2f} | {current * 1e6 / size:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark : recherche plein texte dans l'historique (FTS5) à 100 000 emails
+
+L'historique est construit dans un dossier temporaire à partir du corpus
+synthétique, puis chaque recherche est chronométrée. Objectif : moins de
+50 ms par recherche.
+
+Usage : python benchmarks/bench_search.py [nombre d'emails]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from corpus import generate_corpus
+from filters import EmailRecord, categorize_email, clean_email_body, create_email_summary
+from history_store import HistoryStore, parse_search_query
+
+TARGET_MS = 50
+REPEAT = 20
+QUERIES = [
+    "capgemini",
+    "capgemini depuis:2026-09-15",
+    "entretien",
+    "data engineer",
+    "malheureusement",
+    "thales interview",
+    "greenhouse",
+    "inexistant",
+]
+
+
+def build_history(store, count):
+    """Enregistre `count` emails catégorisés dans l'historique, comme une exécution"""
+    run_id = store.start_run()
+    num = 0
+    clean_bodies = {}
+    for email in generate_corpus(count):
+        record = EmailRecord(email)
+        category = categorize_email(record) or "📧 CANDIDATURE"
+        num += 1
+        summary = create_email_summary(record)
+        summary['num'] = num
+        # Les corps sont partagés entre emails du corpus : nettoyés une fois
+        body = email['body']
+        if id(body) not in clean_bodies:
+            clean_bodies[id(body)] = clean_email_body(body)
+        store.record(run_id, record, category, summary, clean_bodies[id(body)])
+    store.finish_run(run_id, count, 0)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as directory:
+        store = HistoryStore(os.path.join(directory, 'history.db'))
+        start = time.perf_counter()
+        build_history(store, count)
+        print(f"📚 Historique de {count} emails construit en {time.perf_counter() - start:.1f}s\n")
+
+        print(f"{'Recherche':<30} | {'Résultats':>9} | {'médiane (ms)':>12} | {'max (ms)':>9}")
+        print("-" * 70)
+        worst = 0.0
+        for text in QUERIES:
+            terms, since = parse_search_query(text)
+            timings = []
+            for _ in range(REPEAT):
+                start = time.perf_counter()
+                results, _ = store.search(terms, since)
+                timings.append((time.perf_counter() - start) * 1000)
+            worst = max(worst, statistics.median(timings))
+            print(f"{text:<30} | {len(results):>9} | {statistics.median(timings):>12.2f} | {max(timings):>9.2f}")
+        store.close()
+
+    status = "✅" if worst < TARGET_MS else "❌"
+    print(f"\n{status} Pire médiane: {worst:.2f} ms (objectif < {TARGET_MS} ms)")
+    return 0 if worst < TARGET_MS else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
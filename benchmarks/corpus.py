@@ -0,0 +1,183 @@
+"""
+Générateur d'un corpus synthétique d'emails de recherche d'emploi (français et anglais)
+
+Le corpus est reproductible (graine fixe) et mélange refus, convocations à un
+entretien, accusés de réception d'ATS, newsletters et alertes emploi, avec une
+part de corps HTML lourds (emails marketing). Les corps sont tirés d'une
+réserve bornée : 100 000 emails tiennent en mémoire.
+"""
+
+import random
+
+# Part de chaque type d'email dans le corpus
+MIX = {
+    'refus': 0.20,
+    'entretien': 0.10,
+    'accuse_reception': 0.25,
+    'newsletter': 0.30,
+    'alerte_emploi': 0.15,
+}
+
+# Part des emails dont le corps est un HTML marketing lourd (newsletters et alertes)
+HEAVY_HTML_SHARE = 0.05
+HEAVY_HTML_KINDS = ('newsletter', 'alerte_emploi')
+HEAVY_HTML_KB = (20, 120)
+
+# Nombre de corps distincts par type (les emails en partagent)
+BODY_POOL_SIZE = 400
+
+COMPANIES = [
+    'Acme Corp', 'Capgemini Engineering', 'Thales', 'Doctolib', 'Banque de France',
+    'Big Data & Co', 'Airbus', 'Datadog', 'Mirakl', 'Back Market', 'Qonto', 'Alan',
+]
+FIRST_NAMES = ['Julie', 'Thomas', 'Sarah', 'Nicolas', 'Emma', 'Lucas', 'Chloé', 'Hugo']
+ROLES = ['Data Engineer', 'Développeur Python', 'Product Manager', 'Ingénieur DevOps', 'Data Analyst']
+
+TEMPLATES = {
+    'refus': {
+        'senders': ['recrutement@{domain}', 'talent@{domain}', 'no-reply@{domain}'],
+        'fr': (
+            ["Votre candidature chez {company}", "Suite de votre candidature - {role}"],
+            "Bonjour {name},\n\nNous vous remercions de l'intérêt porté à {company}. "
+            "Malheureusement, votre profil n'a pas été retenu pour le poste de {role}. "
+            "Nous conservons votre CV et ne manquerons pas de revenir vers vous.\n\nL'équipe RH",
+        ),
+        'en': (
+            ["Your application at {company}", "Update on your application - {role}"],
+            "Hi {name},\n\nThank you for your interest in {company}. Unfortunately, we have "
+            "decided not to move forward with your application for the {role} position. "
+            "We wish you the best in your search.\n\nTalent Team",
+        ),
+    },
+    'entretien': {
+        'senders': ['{first}.rh@{domain}', 'recrutement@{domain}'],
+        'fr': (
+            ["Convocation entretien - {role}", "Invitation entretien chez {company}"],
+            "Bonjour {name},\n\n{company} recrute un {role} et votre profil a retenu notre "
+            "attention. Nous vous proposons un entretien téléphonique mardi à 14h. "
+            "Merci de confirmer votre disponibilité : https://calendly.com/{slug}/entretien?utm_source=mail\n\n{first}",
+        ),
+        'en': (
+            ["Interview invitation - {role}", "Next steps: interview at {company}"],
+            "Hi {name},\n\nWe would love to schedule an interview for the {role} role at {company}. "
+            "Please pick a slot here: https://{slug}.greenhouse.io/interviews/123?trk=email\n\n{first}",
+        ),
+    },
+    'accuse_reception': {
+        'senders': ['no-reply@{slug}.myworkdayjobs.com', 'notifications@greenhouse.io', 'careers@{domain}'],
+        'fr': (
+            ["Confirmation de candidature - {role}", "Nous avons bien reçu votre candidature"],
+            "<html><body><p>Bonjour {name},</p><p>Votre candidature pour le poste de {role} chez "
+            "{company} a bien été reçue. Notre équipe l'étudie avec attention.</p>"
+            "<p><a href=\"https://{slug}.wd3.myworkdayjobs.com/fr-FR/careers/job/{role_slug}?refId=abc\">Suivre ma candidature</a></p>"
+            "</body></html>",
+        ),
+        'en': (
+            ["Thank you for applying to {company}", "Application received - {role}"],
+            "<html><body><p>Hi {name},</p><p>Thanks for applying to the {role} position at {company}. "
+            "We have received your application and will review it shortly.</p>"
+            "<p><a href=\"https://boards.greenhouse.io/{slug}/jobs/4567?utm_campaign=ack\">View the job</a></p>"
+            "</body></html>",
+        ),
+    },
+    'newsletter': {
+        'senders': ['newsletter@{domain}', 'marketing@shop.{domain}', 'promo@{domain}'],
+        'fr': (
+            ["Soldes : -50% sur toute la boutique", "Vente flash : livraison gratuite ce week-end"],
+            "<p>Profitez de nos soldes : code promo BIENVENUE, livraison gratuite dès 50€. "
+            "Découvrez notre boutique en ligne.</p>",
+        ),
+        'en': (
+            ["Black Friday: up to 50% off", "Cyber Monday deals inside"],
+            "<p>Our biggest shopping event: Black Friday promotion on all items. Free delivery, "
+            "exclusive campaign for our members.</p>",
+        ),
+    },
+    'alerte_emploi': {
+        'senders': ['jobalerts-noreply@linkedin.com', 'alert@indeed.com', 'alerte@emails.hellowork.com'],
+        'fr': (
+            ["Alerte emploi : 12 nouveaux emplois {role}", "{company} et 8 autres emplois pour vous"],
+            "Nouvelles offres d'emploi rien que pour vous. {company} recrute un {role}. "
+            "Postulez maintenant : https://fr.indeed.com/viewjob?jk={slug}&utm_source=alert "
+            "https://www.linkedin.com/jobs/view/98765/?trk=eml-jobs",
+        ),
+        'en': (
+            ["Job alert: {role} at {company}", "New jobs from {company}"],
+            "New jobs posted from {company}: {role}. See all: https://www.linkedin.com/comm/jobs/view/111?trk=alert "
+            "https://www.glassdoor.com/job-listing/{slug}",
+        ),
+    },
+}
+
+
+def _slug(text):
+    return ''.join(c if c.isalnum() else '-' for c in text.lower()).strip('-')
+
+
+def marketing_html(size_kb, rng):
+    """Corps HTML marketing lourd : styles, tableaux imbriqués, entités, liens de suivi"""
+    words = ["offre", "exclusive", "découvrez", "nouveauté", "collection", "livraison",
+             "gratuite", "&eacute;t&eacute;", "&nbsp;", "&amp;", "promo", "-30%", "&#8217;"]
+    parts = ['<html><head><title>Newsletter</title><style>',
+             '.btn{font-size:14px;color:#fff} ' * 50, '</style></head><body>']
+    size = 0
+    while size < size_kb * 1024:
+        text = ' '.join(rng.choice(words) for _ in range(rng.randint(5, 30)))
+        block = (
+            f'<table class="row" style="width:100%"><tr><td style="padding:10px">'
+            f'<div class="c"><h2>Titre</h2><p>{text}</p><!-- tracking -->'
+            f'<a href="https://shop.example.com/p/{rng.randint(1, 9999)}?utm_source=nl">Voir</a>'
+            f'<ul><li>{text}</li></ul><br/></div></td></tr></table>'
+        )
+        parts.append(block)
+        size += len(block)
+    parts.append('<p>Commercial Register: 12345</p></body></html>')
+    return ''.join(parts)
+
+
+def _fill(template, rng):
+    company = rng.choice(COMPANIES)
+    first = rng.choice(FIRST_NAMES)
+    role = rng.choice(ROLES)
+    values = {
+        'company': company, 'slug': _slug(company), 'domain': _slug(company) + '.com',
+        'first': first.lower(), 'name': rng.choice(FIRST_NAMES), 'role': role, 'role_slug': _slug(role),
+    }
+    return template.format(**values), values
+
+
+def _body_pool(kind, rng):
+    """Réserve de corps distincts pour un type d'email"""
+    heavy_share = HEAVY_HTML_SHARE / sum(MIX[heavy_kind] for heavy_kind in HEAVY_HTML_KINDS)
+    pool = []
+    for _ in range(BODY_POOL_SIZE):
+        if kind in HEAVY_HTML_KINDS and rng.random() < heavy_share:
+            pool.append(marketing_html(rng.randint(*HEAVY_HTML_KB), rng))
+        else:
+            language = rng.choice(('fr', 'en'))
+            pool.append(_fill(TEMPLATES[kind][language][1], rng)[0])
+    return pool
+
+
+def generate_corpus(count, seed=0):
+    """Renvoie `count` emails au format des handlers (même graine -> même corpus)"""
+    rng = random.Random(seed)
+    kinds = list(MIX)
+    weights = [MIX[kind] for kind in kinds]
+    pools = {kind: _body_pool(kind, rng) for kind in kinds}
+
+    emails = []
+    for i in range(count):
+        kind = rng.choices(kinds, weights)[0]
+        language = rng.choice(('fr', 'en'))
+        subject, values = _fill(rng.choice(TEMPLATES[kind][language][0]), rng)
+        sender = rng.choice(TEMPLATES[kind]['senders']).format(**values)
+        emails.append({
+            'account': rng.choice(('Pro', 'Perso')),
+            'id': f'{kind}-{i:06d}',
+            'sender': f"{values['company']} <{sender}>",
+            'subject': subject,
+            'date': f"Mon, {1 + i % 28:02d} Sep 2026 10:{i % 60:02d}:00 +0200",
+            'body': rng.choice(pools[kind]),
+        })
+    return emails
@@ -0,0 +1,194 @@
+"""
+Suite de benchmarks des filtres et du rapport HTML sur un corpus synthétique
+
+Chaque fonction est chronométrée sur 1 000, 10 000 et 100 000 emails. Le
+temps retenu est la médiane de plusieurs exécutions, exprimée en unités de
+calibration : le temps d'une boucle de référence (chaînes, regex,
+dictionnaires) mesurée juste avant chaque exécution. Les références de
+benchmarks/baselines.json ne dépendent ainsi ni de la machine ni de sa charge
+du moment. Le script échoue (code de sortie 1) si un temps dépasse sa
+référence de plus de la tolérance.
+
+Usage :
+    python benchmarks/run_benchmarks.py                      # tailles 1k, 10k, 100k
+    python benchmarks/run_benchmarks.py --sizes 1000 10000   # tailles choisies
+    python benchmarks/run_benchmarks.py --update-baselines   # enregistre les références
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from corpus import generate_corpus
+from config import CATEGORIES
+from filters import (
+    is_promotional_email, categorize_email, create_email_summary, clean_email_body,
+    extract_links_from_email
+)
+from report import generate_html_report
+
+BASELINES_FILE = os.path.join(BENCH_DIR, 'baselines.json')
+DEFAULT_SIZES = [1000, 10000, 100000]
+# Marge acceptée au-dessus de la référence avant de signaler une régression : même
+# normalisées, des mesures consécutives varient encore de ±35 % sur une machine chargée
+DEFAULT_TOLERANCE = 0.5
+# Nombre de mesures par taille (la médiane est retenue)
+REPEATS = {1000: 7, 10000: 5}
+DEFAULT_REPEAT = 3
+# Mesures de la boucle de calibration avant chaque exécution (la plus rapide est retenue)
+CALIBRATION_REPEAT = 3
+
+_CALIBRATION_TEXT = ("Bonjour, suite à votre candidature chez Acme nous souhaitons vous proposer "
+                     "un entretien https://careers.acme.com/job/42?utm_source=mail ") * 4
+_CALIBRATION_RE = re.compile(r'https?://[^\s<>"\']+')
+
+
+def _categorized(emails):
+    """Résumés rangés par catégorie, comme dans job_tracker.main"""
+    categorized = {category: [] for category in CATEGORIES}
+    for num, email in enumerate(emails, 1):
+        category = categorize_email(email)
+        if category and not is_promotional_email(email):
+            summary = create_email_summary(email)
+            summary['num'] = num
+            categorized[category].append(summary)
+    return categorized
+
+
+def _report(categorized):
+    """Rapport HTML écrit dans un fichier temporaire, sans message console"""
+    with tempfile.TemporaryDirectory() as directory:
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_html_report(categorized, os.path.join(directory, 'rapport.html'))
+
+
+def build_cases(emails):
+    """Fonctions chronométrées : nom -> fonction sans argument"""
+    bodies = [email['body'] for email in emails]
+    categorized = _categorized(emails)
+    return {
+        'is_promotional_email': lambda: [is_promotional_email(email) for email in emails],
+        'categorize_email': lambda: [categorize_email(email) for email in emails],
+        'create_email_summary': lambda: [create_email_summary(email) for email in emails],
+        'clean_email_body': lambda: [clean_email_body(body) for body in bodies],
+        'extract_links_from_email': lambda: [extract_links_from_email(body) for body in bodies],
+        'generate_html_report': lambda: _report(categorized),
+    }
+
+
+def _timed(func):
+    """Durée (secondes) d'un appel, ramasse-miettes suspendu comme dans timeit : sinon
+    ses passes sur le corpus en mémoire pèsent plus lourd sur les grandes tailles"""
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def measure(func, repeat):
+    """(temps médian en secondes, temps médian en unités de calibration) sur `repeat` exécutions
+
+    La boucle de calibration est chronométrée juste avant chaque exécution :
+    une exécution ralentie par la charge de la machine l'est aussi dans son
+    unité, et la médiane écarte les mesures isolées.
+    """
+    timings = []
+    units = []
+    for _ in range(repeat):
+        calibration = min(_timed(_calibration_loop) for _ in range(CALIBRATION_REPEAT))
+        elapsed = _timed(func)
+        timings.append(elapsed)
+        units.append(elapsed / calibration)
+    return statistics.median(timings), statistics.median(units)
+
+
+def _calibration_loop():
+    """Travail de référence proche de celui des filtres : minuscules, regex, dictionnaires"""
+    counts = {}
+    for _ in range(1200):
+        text = _CALIBRATION_TEXT.lower()
+        for word in text.split():
+            counts[word] = counts.get(word, 0) + 1
+        _CALIBRATION_RE.findall(text)
+        'entretien' in text
+    return counts
+
+
+def load_baselines():
+    if not os.path.exists(BASELINES_FILE):
+        return {}
+    with open(BASELINES_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baselines(baselines):
+    with open(BASELINES_FILE, 'w', encoding='utf-8') as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks des filtres et du rapport HTML")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--update-baselines', action='store_true')
+    args = parser.parse_args(argv)
+
+    baselines = load_baselines()
+    regressions = []
+
+    print(f"{'Fonction':<26} | {'Emails':>7} | {'Temps (ms)':>11} | {'Unités':>9} | {'Référence':>10} | {'Écart':>7}")
+    print("-" * 86)
+    for size in args.sizes:
+        emails = generate_corpus(size, args.seed)
+        for name, func in build_cases(emails).items():
+            elapsed, units = measure(func, REPEATS.get(size, DEFAULT_REPEAT))
+            key = f"{name}@{size}"
+            baseline = baselines.get(key)
+
+            if baseline:
+                ratio = units / baseline - 1
+                status = f"{ratio:>+6.0%}"
+                if ratio > args.tolerance:
+                    status += " ❌"
+                    regressions.append(key)
+                reference = f"{baseline:>10.1f}"
+            else:
+                status = f"{'-':>7}"
+                reference = f"{'-':>10}"
+            print(f"{name:<26} | {size:>7} | {elapsed * 1000:>11.1f} | {units:>9.1f} | {reference} | {status}")
+
+            if args.update_baselines:
+                baselines[key] = round(units, 2)
+
+    if args.update_baselines:
+        save_baselines(baselines)
+        print(f"\n💾 Références enregistrées dans {BASELINES_FILE}")
+        return 0
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} régression(s) au-delà de {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    print("\n✅ Aucune régression")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Cache local des résultats de classification (SQLite)
+"""
+
+import json
+import sqlite3
+import time
+
+from config import CLASSIFICATION_CACHE_ENABLED, CLASSIFICATION_CACHE_FILE
+
+# Limite du nombre de paramètres d'une requête SQLite
+_CHUNK = 500
+
+
+def _dump_summary(summary):
+    """Résumé en JSON, sans l'entreprise"""
+    if summary is None:
+        return None
+    return json.dumps({key: value for key, value in summary.items() if key != 'entreprise'},
+                      ensure_ascii=False)
+
+
+class ClassificationCache:
+    """Stocke (promotionnel, catégorie, résumé) par (compte, id, empreinte des règles).
+
+    Les entrées calculées avec d'autres règles ne peuvent plus servir : elles
+    sont supprimées à l'ouverture de la base. L'entreprise n'est pas gardée
+    dans le résumé : elle dépend des domaines appris d'une exécution à l'autre
+    (company_cache.json) et doit être recalculée à chaque lecture.
+    """
+
+    def __init__(self, path, fingerprint):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+
+    def _connection(self):
+        """Ouvre la base au premier accès"""
+        if self._conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS classifications (
+                    account TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    promotional INTEGER NOT NULL,
+                    category TEXT,
+                    summary TEXT,
+                    classified_at REAL NOT NULL,
+                    PRIMARY KEY (account, id, fingerprint)
+                )
+            """)
+            conn.execute("DELETE FROM classifications WHERE fingerprint != ?", (self.fingerprint,))
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get_many(self, keys):
+        """Renvoie {(compte, id): résultat} pour les clés présentes dans le cache"""
+        found = {}
+        conn = self._connection()
+        by_account = {}
+        for account, msg_id in keys:
+            by_account.setdefault(account, []).append(msg_id)
+
+        for account, msg_ids in by_account.items():
+            for i in range(0, len(msg_ids), _CHUNK):
+                chunk = msg_ids[i:i + _CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                rows = conn.execute(
+                    f"SELECT id, promotional, category, summary FROM classifications "
+                    f"WHERE account = ? AND fingerprint = ? AND id IN ({placeholders})",
+                    [account, self.fingerprint] + chunk
+                ).fetchall()
+                for msg_id, promotional, category, summary in rows:
+                    summary = json.loads(summary) if summary else None
+                    if summary is not None:
+                        summary.pop('entreprise', None)
+                    found[(account, msg_id)] = (bool(promotional), category, summary)
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        """Enregistre des résultats : liste de ((compte, id), résultat), sans l'entreprise"""
+        now = time.time()
+        rows = [
+            (account, msg_id, self.fingerprint, int(promotional), category, _dump_summary(summary), now)
+            for (account, msg_id), (promotional, category, summary) in items
+        ]
+        if not rows:
+            return
+        conn = self._connection()
+        conn.executemany(
+            "INSERT OR REPLACE INTO classifications "
+            "(account, id, fingerprint, promotional, category, summary, classified_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        conn.commit()
+
+    def hit_rate(self):
+        """Part des emails dont la classification a été trouvée dans le cache"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def close(self):
+        """Ferme la connexion SQLite"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+_cache = None
+
+
+def get_classification_cache(fingerprint):
+    """Cache des classifications pour un jeu de règles (None si désactivé dans la config)"""
+    global _cache
+    if not CLASSIFICATION_CACHE_ENABLED:
+        return None
+    if _cache is None or _cache.fingerprint != fingerprint:
+        _cache = ClassificationCache(CLASSIFICATION_CACHE_FILE, fingerprint)
+    return _cache
@@ -0,0 +1,186 @@
+"""
+Extraction du nom de l'entreprise d'un email, en temps linéaire
+"""
+
+import json
+import os
+import re
+
+from sender_index import SenderIndex
+
+# Nom d'entreprise : des mots commençant par une majuscule (ou des mots de
+# liaison), au plus COMPANY_MAX_WORDS. Les mots et les espaces sont bornés :
+# chaque position de départ coûte un nombre d'étapes constant, sans retour
+# arrière sur toute une suite de mots en majuscules.
+COMPANY_MAX_WORDS = 6
+COMPANY_MAX_WORD_CHARS = 40
+_WORD = rf'[A-Z][A-Za-z&]{{0,{COMPANY_MAX_WORD_CHARS - 1}}}'
+_NAME = rf'{_WORD}(?:[ \t]{{1,3}}(?:{_WORD}|&|de|du|des|et|and|of)){{0,{COMPANY_MAX_WORDS - 1}}}?'
+
+COMPANY_PATTERNS = [
+    rf'(?:\b(?:chez|at)|@)\s{{1,3}}({_NAME})(?:\s{{1,3}}recrute|\s{{1,3}}recherche|[.,])',
+    rf'\b({_NAME})\s{{1,3}}recrute',
+]
+# Mot sans lequel chaque motif ne peut pas correspondre : le motif n'est
+# essayé que si le mot est dans le texte (recherche de sous-chaîne, en C)
+COMPANY_PATTERN_LITERALS = [None, 'recrute']
+
+# Domaines qui envoient des emails pour le compte de plusieurs entreprises :
+# jamais associés à un nom d'entreprise. Messageries, puis logiciels de
+# recrutement (ATS) qui relaient les emails des recruteurs
+SHARED_SENDER_DOMAINS = [
+    'gmail.com', 'googlemail.com', 'outlook.com', 'outlook.fr', 'hotmail.com', 'hotmail.fr',
+    'live.com', 'live.fr', 'yahoo.com', 'yahoo.fr', 'icloud.com', 'orange.fr', 'free.fr',
+    'laposte.net', 'sfr.fr', 'wanadoo.fr',
+    'teamtailor.com', 'teamtailor-mail.com', 'jobteaser.com', 'welcomekit.co', 'welcomekit.io',
+    'myworkday.com', 'myworkdayjobs.com', 'workablemail.com', 'workable.com', 'recruitee.com',
+    'taleo.net', 'successfactors.com', 'successfactors.eu', 'icims.com', 'jobvite.com',
+    'ashbyhq.com', 'breezy.hr', 'bamboohr.com', 'personio.de', 'personio.com', 'softgarden.de',
+    'flatchr.io', 'digitalrecruiters.com', 'beetween.com', 'applytojob.com', 'pinpointhq.com',
+    'jobaffinity.fr', 'werecruit.io', 'taleez.com', 'hrflow.ai', 'cornerstoneondemand.com',
+]
+
+# Nombre d'emails distincts, sans contradiction, qui doivent citer la même
+# entreprise avant que le domaine de leur expéditeur lui soit associé
+COMPANY_MIN_OBSERVATIONS = 2
+
+
+def load_company_cache(path):
+    """Charge le cache des entreprises par domaine d'expéditeur.
+
+    Renvoie {'entreprises': {domaine: entreprise}, 'candidats': {domaine:
+    {'entreprise': ..., 'emails': [...]}}, 'partages': [domaine, ...]}, vide
+    si le fichier est absent ou illisible. L'ancien format (domaine ->
+    entreprise) est relu comme une liste de candidats déjà vus une fois.
+    """
+    cache = {'entreprises': {}, 'candidats': {}, 'partages': []}
+    if not os.path.exists(path):
+        return cache
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return cache
+    if not isinstance(data, dict):
+        return cache
+
+    if 'entreprises' in data or 'candidats' in data or 'partages' in data:
+        for key, default in cache.items():
+            if isinstance(data.get(key), type(default)):
+                cache[key] = data[key]
+    else:
+        cache['candidats'] = {
+            domain: {'entreprise': company, 'emails': [None]}
+            for domain, company in data.items() if isinstance(company, str)
+        }
+    return cache
+
+
+def _same_company(a, b):
+    """Compare deux noms d'entreprise sans tenir compte de la casse"""
+    return a.casefold() == b.casefold()
+
+
+class CompanyExtractor:
+    """Trouve l'entreprise d'un email dans son texte, à défaut d'après son expéditeur.
+
+    Le cache des domaines est lu une fois à la construction. Les associations
+    apprises pendant l'exécution ne servent qu'aux exécutions suivantes : le
+    résultat ne dépend pas de l'ordre de traitement des emails.
+
+    Un domaine n'est associé à une entreprise qu'après COMPANY_MIN_OBSERVATIONS
+    emails distincts la citant. Dès que deux emails d'un même domaine citent
+    des entreprises différentes (relais d'un logiciel de recrutement, par
+    exemple), le domaine est marqué comme partagé et n'est plus jamais associé.
+    """
+
+    def __init__(self, cache_file, job_domains=()):
+        self.cache_file = cache_file
+        cache = load_company_cache(cache_file)
+        self.companies = cache['entreprises']
+        self.candidates = cache['candidats']
+        self.shared = set(cache['partages'])
+        # Associations utilisées pendant l'exécution (celles du début de l'exécution)
+        self.known = dict(self.companies)
+        self.changed = False
+        self.company_res = [
+            (re.compile(pattern), literal) for pattern, literal in zip(COMPANY_PATTERNS, COMPANY_PATTERN_LITERALS)
+        ]
+        # Plateformes d'emploi (« linkedin.com/jobs » -> linkedin.com) et messageries
+        self.shared_index = SenderIndex(
+            SHARED_SENDER_DOMAINS + [domain.partition('/')[0] for domain in job_domains]
+        )
+
+    def is_company_domain(self, address):
+        """Vérifie si le domaine d'une adresse identifie une seule entreprise"""
+        return '@' in address and not self.shared_index.matches(address)
+
+    def find_in_text(self, text):
+        """Nom d'entreprise cité dans le texte, ou None"""
+        for company_re, literal in self.company_res:
+            if literal is not None and literal not in text:
+                continue
+            match = company_re.search(text)
+            if match:
+                return match.group(1).strip()
+        return None
+
+    def extract(self, text, address):
+        """Nom d'entreprise d'après le texte, sinon d'après le domaine de l'adresse"""
+        company = self.find_in_text(text)
+        if company is None and self.is_company_domain(address):
+            company = self.known.get(address.rpartition('@')[2])
+        return company
+
+    def _mark_shared(self, domain):
+        """Le domaine a cité plusieurs entreprises : il ne sera plus associé à aucune"""
+        self.companies.pop(domain, None)
+        self.candidates.pop(domain, None)
+        self.shared.add(domain)
+        self.changed = True
+
+    def learn(self, address, company, email_key=None):
+        """Note qu'un email (identifié par `email_key`) de cette adresse cite `company`"""
+        if not company or not self.is_company_domain(address):
+            return
+        domain = address.rpartition('@')[2]
+        if domain in self.shared:
+            return
+
+        confirmed = self.companies.get(domain)
+        if confirmed is not None:
+            if not _same_company(confirmed, company):
+                self._mark_shared(domain)
+            return
+
+        candidate = self.candidates.get(domain)
+        if candidate is None:
+            self.candidates[domain] = {'entreprise': company, 'emails': [email_key]}
+        elif not _same_company(candidate['entreprise'], company):
+            self._mark_shared(domain)
+            return
+        elif email_key is not None and email_key in candidate['emails']:
+            return
+        else:
+            candidate['emails'].append(email_key)
+            if len(candidate['emails']) >= COMPANY_MIN_OBSERVATIONS:
+                self.companies[domain] = candidate['entreprise']
+                del self.candidates[domain]
+        self.changed = True
+
+    def save(self):
+        """Enregistre les associations apprises dans le fichier cache"""
+        if not self.changed:
+            return
+        cache = {
+            'entreprises': self.companies,
+            'candidats': self.candidates,
+            'partages': sorted(self.shared),
+        }
+        try:
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, ensure_ascii=False, indent=2, sort_keys=True)
+        except OSError as e:
+            print(f"⚠️  Cache des entreprises non enregistré: {e}")
+        else:
+            self.changed = False
@@ -7,6 +7,9 @@ from datetime import datetime, timedelta
 # Scopes pour Gmail
 GMAIL_SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
 
+# Document de découverte de l'API Gmail mis en cache localement
+GMAIL_DISCOVERY_FILE = "gmail_discovery.json"
+
 # Scopes pour Outlook
 OUTLOOK_SCOPES = ['https://graph.microsoft.com/Mail.Read']
 
@@ -77,6 +80,104 @@ ACCOUNTS = [
     # {"type": "outlook", "name": "Outlook Pro", "token_file": "token_outlook.json"},
 ]
 
+# ============================================================================
+# RÉCUPÉRATION DES EMAILS
+# ============================================================================
+
+# Nombre de comptes récupérés en parallèle
+FETCH_MAX_WORKERS = 4
+# Nombre maximal d'emails en attente par compte (mémoire bornée)
+FETCH_QUEUE_SIZE = 500
+
+# Synchronisation incrémentale Gmail : ne récupère que les messages arrivés
+# depuis la dernière exécution (historyId sauvegardé à côté du token_file).
+# Le rapport ne contient alors que les nouveaux emails.
+GMAIL_INCREMENTAL_SYNC = False
+
+# Synchronisation delta Outlook (Graph /messages/delta) : ne transfère que les
+# messages modifiés depuis la dernière exécution (deltaLink sauvegardé à côté
+# du token_file). Le rapport ne contient alors que les nouveaux emails.
+OUTLOOK_DELTA_SYNC = False
+
+# Délai maximal (secondes) d'une requête HTTP vers Microsoft Graph
+HTTP_TIMEOUT = 30
+# Nombre de nouvelles tentatives en cas d'erreur réseau (connexion, lecture)
+HTTP_RETRIES = 3
+
+# Quotas des API : unités Gmail par seconde et par compte (limite Google : 250),
+# requêtes Graph par seconde et par compte
+GMAIL_QUOTA_UNITS_PER_SEC = 250
+GRAPH_REQUESTS_PER_SEC = 10
+# Nouvelles tentatives sur HTTP 429 / 5xx : backoff exponentiel avec jitter
+API_MAX_RETRIES = 5
+API_BACKOFF_BASE = 1.0
+API_BACKOFF_MAX = 60.0
+
+# Récupération en deux phases : en-têtes d'abord (Subject, From, Date), puis
+# corps complet uniquement pour les emails qui passent le filtre anti-promo.
+# N'économise que de la bande passante : un messages.get Gmail coûte 5 unités
+# de quota en format 'metadata' comme en 'full' (10 unités au lieu de 5 pour un
+# email retenu), et chaque corps Outlook complété via $batch compte comme une
+# requête Graph. Utile seulement sur une connexion lente et très chargée en promos
+TWO_PHASE_FETCH = False
+
+# Taille maximale décodée du corps d'un email Gmail (octets). Les filtres n'en
+# lisent que le début ; le corps complet est décodé à la demande (vue détaillée)
+GMAIL_MAX_BODY_BYTES = 256 * 1024
+
+# Cache local des emails déjà téléchargés (SQLite)
+MESSAGE_CACHE_ENABLED = True
+MESSAGE_CACHE_FILE = "message_cache.db"
+# Éviction : emails plus anciens que N jours, puis les moins récemment lus
+# jusqu'à repasser sous la taille maximale
+MESSAGE_CACHE_MAX_AGE_DAYS = 30
+MESSAGE_CACHE_MAX_MB = 200
+
+# Taille des pages de résultats (toutes les pages sont parcourues)
+GMAIL_PAGE_SIZE = 100
+OUTLOOK_PAGE_SIZE = 100
+
+# Nombre de messages par requête batch Gmail (max 100, 50 recommandé par Google)
+GMAIL_BATCH_SIZE = 50
+# Nombre de requêtes batch Gmail envoyées en parallèle
+GMAIL_BATCH_CONCURRENCY = 2
+
+# ============================================================================
+# CLASSIFICATION
+# ============================================================================
+
+# Nombre d'emails à partir duquel la classification (promo, catégorie, résumé)
+# est répartie sur plusieurs processus (rattrapage de plusieurs mois d'emails)
+CLASSIFY_PARALLEL_THRESHOLD = 2000
+# Nombre d'emails envoyés à un processus à la fois
+CLASSIFY_CHUNK_SIZE = 250
+# Nombre de processus (None = nombre de cœurs)
+CLASSIFY_MAX_WORKERS = None
+
+# Cache local des résultats de classification (SQLite). Les entrées sont
+# recalculées dès que BLOCKED_SENDERS, PROMO_KEYWORDS ou CATEGORIES changent
+CLASSIFICATION_CACHE_ENABLED = True
+CLASSIFICATION_CACHE_FILE = "classification_cache.db"
+
+# Nombre maximal de liens d'offres conservés par email
+MAX_JOB_LINKS = 10
+
+# Entreprises associées aux domaines des expéditeurs lors des exécutions
+# précédentes (utilisées quand le texte de l'email ne cite pas l'entreprise)
+COMPANY_CACHE_FILE = "company_cache.json"
+
+# Mode détail : nombre de vues détaillées gardées en mémoire, et catégories
+# dont les vues sont préparées en arrière-plan pendant la lecture du récapitulatif
+DETAIL_CACHE_SIZE = 32
+DETAIL_PREFETCH_CATEGORIES = ["✅ ACCEPTÉ / SÉLECTIONNÉ", "📞 ENTRETIEN"]
+
+# Historique des emails classés, toutes exécutions confondues (SQLite)
+HISTORY_DB_FILE = "job_tracker_history.db"
+
+# Rapport HTML : nombre d'emails affichés par page dans chaque catégorie
+# (les pages suivantes sont repliées et ne sont mises en page qu'à l'ouverture)
+REPORT_PAGE_SIZE = 100
+
 # ============================================================================
 # FILTRES ANTI-SPAM / PROMOTIONS
 # ============================================================================
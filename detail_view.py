@@ -0,0 +1,115 @@
+"""
+Vue détaillée des emails du mode interactif : accès direct par numéro,
+rendus mis en cache et préparés à l'avance pour les catégories prioritaires
+"""
+
+import threading
+from collections import OrderedDict
+
+from config import DETAIL_CACHE_SIZE, DETAIL_PREFETCH_CATEGORIES
+from filters import clean_email_body, extract_links_from_email
+from pipeline import load_body
+
+
+def render_email_detail(email, body_text=None):
+    """Texte complet de la vue détaillée d'un email.
+
+    `body_text` est le corps déjà nettoyé par clean_email_body, s'il est connu.
+    """
+    lines = [
+        "\n" + "=" * 80,
+        "📧 DÉTAIL DE L'EMAIL",
+        "=" * 80,
+        f"📌 Compte: [{email.get('account', 'Inconnu')}]",
+        f"📧 De: {email.get('sender', 'Inconnu')}",
+        f"📝 Objet: {email.get('subject', 'Sans objet')}",
+        f"📅 Date: {email.get('date', 'Inconnue')}",
+        "-" * 80,
+        "📄 CONTENU:",
+        "-" * 80,
+    ]
+
+    # Corps complet relu seulement s'il reste à nettoyer, ou pour les liens d'un corps tronqué
+    body = load_body(email) if body_text is None or email.get('raw_body') else ''
+    lines.append(body_text if body_text is not None else clean_email_body(body))
+
+    # Liens déjà extraits pour le résumé, sauf si le corps était tronqué
+    links = extract_links_from_email(body) if email.get('raw_body') else email.links
+    if links:
+        lines.append("\n" + "-" * 80)
+        lines.append("🔗 LIENS TROUVÉS:")
+        for i, link in enumerate(links[:10], 1):
+            lines.append(f"  {i}. {link}")
+
+    lines.append("=" * 80)
+    return '\n'.join(lines)
+
+
+class DetailIndex:
+    """Emails de l'exécution par numéro, avec un cache LRU de leurs vues détaillées.
+
+    Les corps nettoyés des emails à préparer à l'avance (catégories
+    prioritaires, dans la limite du cache) sont gardés dès leur ajout : ils ne
+    sont pas nettoyés une seconde fois.
+    """
+
+    def __init__(self, cache_size=DETAIL_CACHE_SIZE, prefetch_categories=DETAIL_PREFETCH_CATEGORIES):
+        self.emails = {}
+        self.categories = {}
+        self.cache_size = cache_size
+        self.prefetch_categories = prefetch_categories
+        self._bodies = {}
+        self._rendered = OrderedDict()
+        self._lock = threading.Lock()
+        self._prefetch_thread = None
+
+    def __len__(self):
+        return len(self.emails)
+
+    def add(self, num, email, category, body_text=None):
+        """Ajoute l'email numéro `num` de l'exécution, avec son corps nettoyé s'il est connu"""
+        self.emails[num] = email
+        self.categories[num] = category
+        if (body_text is not None and category in self.prefetch_categories
+                and len(self._bodies) < self.cache_size):
+            self._bodies[num] = body_text
+
+    def _store(self, num, text):
+        """Ajoute une vue au cache (appelé sous self._lock)"""
+        self._rendered[num] = text
+        self._rendered.move_to_end(num)
+        while len(self._rendered) > self.cache_size:
+            self._rendered.popitem(last=False)
+
+    def render(self, num):
+        """Vue détaillée de l'email `num` (None s'il n'existe pas), calculée une seule fois"""
+        email = self.emails.get(num)
+        if email is None:
+            return None
+        with self._lock:
+            text = self._rendered.get(num)
+            if text is not None:
+                self._rendered.move_to_end(num)
+                return text
+        text = render_email_detail(email, self._bodies.get(num))
+        with self._lock:
+            self._store(num, text)
+        return text
+
+    def _prefetch(self, nums):
+        """Calcule les vues manquantes (exécuté dans un thread)"""
+        for num in nums:
+            with self._lock:
+                if num in self._rendered:
+                    continue
+            text = render_email_detail(self.emails[num], self._bodies.get(num))
+            with self._lock:
+                if num not in self._rendered:
+                    self._store(num, text)
+
+    def start_prefetch(self):
+        """Prépare en arrière-plan les vues des catégories prioritaires, dans la limite du cache"""
+        nums = [num for num in self.emails if self.categories[num] in self.prefetch_categories][:self.cache_size]
+        if nums:
+            self._prefetch_thread = threading.Thread(target=self._prefetch, args=(nums,), daemon=True)
+            self._prefetch_thread.start()
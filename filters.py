@@ -2,172 +2,484 @@
 Fonctions de filtrage et analyse des emails
 """
 
+import hashlib
+import json
+import os
 import re
-from config import BLOCKED_SENDERS, PROMO_KEYWORDS, CATEGORIES
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from email.utils import parseaddr
+from config import (
+    BLOCKED_SENDERS, PROMO_KEYWORDS, CATEGORIES,
+    CLASSIFY_PARALLEL_THRESHOLD, CLASSIFY_CHUNK_SIZE, CLASSIFY_MAX_WORKERS, MAX_JOB_LINKS,
+    COMPANY_CACHE_FILE
+)
+from classification_cache import get_classification_cache
+from company import COMPANY_PATTERNS, CompanyExtractor
+from html_cleaner import html_to_text
+from links import LinkExtractor
+from matcher import KeywordMatcher
+from sender_index import SenderIndex
+
+# Alertes emploi et newsletters automatiques
+NEWSLETTER_PATTERNS = [
+    r"alerte.*emploi",
+    r"job.*alert",
+    r"\d+\s+autres?\s+emplois?",
+    r"\d+\s+nouveaux?\s+emplois?",
+    r"postulez maintenant.*et\s+\d+",
+    r"pour\s+\w+\s+vous\s+attendent",
+    r"nouvelle[s]?\s+offre[s]?\s+d'emploi\s+rien\s+que\s+pour\s+vous",
+    r"jobs?\s+posted\s+from",
+    r"new\s+jobs?\s+from",
+]
+
+JOB_DOMAINS = [
+    'linkedin.com/jobs', 'indeed.com', 'glassdoor.com', 'welcometothejungle.com',
+    'hellowork.com', 'apec.fr', 'cadremploi.fr', 'monster.fr', 'talent.io',
+    'jobs2web.com', 'workday.com', 'greenhouse.io', 'lever.co', 'smartrecruiters.com'
+]
+
+FOOTER_PATTERNS = [
+    r'Commercial Register.*$',
+    r'Managing Directors?:.*$',
+    r'District Court.*$',
+    r'@media\s*\([^)]+\)\s*\{[^}]+\}',
+    r'\{[^}]*font-size[^}]*\}',
+]
+
+MAX_CLEAN_BODY_CHARS = 3000
+# Texte supplémentaire extrait au-delà de la limite, pour compenser les footers supprimés
+CLEAN_BODY_MARGIN = 1000
+
+# Portion du corps lue par les filtres
+PROMO_BODY_CHARS = 500
+CATEGORY_BODY_CHARS = 1000
+SUMMARY_BODY_CHARS = 500
+
+# Version du code des règles, à incrémenter quand leur comportement change :
+# les classifications en cache sont alors recalculées
+RULESET_VERSION = 1
+
+# Champs transmis aux processus de classification
+CLASSIFY_FIELDS = ('account', 'sender', 'subject', 'date', 'body')
+
+
+_PLAIN_ADDRESS_RE = re.compile(r'[^\s<>()",;:@\[\]\\]+@[^\s<>()",;:@\[\]\\]+')
+# Caractères d'un nom affiché qui changent la lecture de l'en-tête (guillemets, listes...)
+_NAME_SPECIALS_RE = re.compile(r'[<>()",;:@\[\]\\]')
+
+
+def _sender_address(sender):
+    """Adresse d'un en-tête From, en minuscules.
+
+    Les formes courantes (« Nom <adresse> », adresse seule) sont lues
+    directement ; les autres passent par parseaddr, bien plus coûteux.
+    """
+    name, bracket, rest = sender.rpartition('<')
+    candidate = rest[:-1].strip() if bracket and rest.endswith('>') and '"' not in rest else sender.strip()
+    if _PLAIN_ADDRESS_RE.fullmatch(candidate) and (not bracket or _NAME_SPECIALS_RE.search(name) is None):
+        return candidate.lower()
+    return parseaddr(sender)[1].lower()
+
+
+class EmailRecord:
+    """Vue d'un email dont les champs dérivés sont calculés une seule fois, au premier accès.
+
+    Se lit comme le dictionnaire d'origine (email['subject'], email.get('body')).
+    """
+
+    __slots__ = (
+        'data', '_subject_lower', '_body_lower', '_promo_text', '_category_text',
+        '_sender_address', '_sender_domain', '_links'
+    )
+
+    def __init__(self, data):
+        self.data = data
+        self._subject_lower = None
+        self._body_lower = None
+        self._promo_text = None
+        self._category_text = None
+        self._sender_address = None
+        self._sender_domain = None
+        self._links = None
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    @property
+    def subject_lower(self):
+        if self._subject_lower is None:
+            self._subject_lower = self.data['subject'].lower()
+        return self._subject_lower
+
+    @property
+    def body_lower(self):
+        """Début du corps en minuscules (la partie lue par les filtres)"""
+        if self._body_lower is None:
+            self._body_lower = self.data.get('body', '')[:CATEGORY_BODY_CHARS].lower()[:CATEGORY_BODY_CHARS]
+        return self._body_lower
+
+    @property
+    def promo_text(self):
+        """Texte analysé par le filtre anti-promo : objet + début du corps"""
+        if self._promo_text is None:
+            self._promo_text = self.subject_lower + " " + self.body_lower[:PROMO_BODY_CHARS]
+        return self._promo_text
+
+    @property
+    def category_text(self):
+        """Texte analysé pour la catégorisation : objet + début du corps"""
+        if self._category_text is None:
+            self._category_text = self.subject_lower + " " + self.body_lower
+        return self._category_text
+
+    @property
+    def summary_text(self):
+        """Texte dans lequel le nom de l'entreprise est recherché"""
+        return self.data['subject'] + ' ' + self.data.get('body', '')[:SUMMARY_BODY_CHARS]
+
+    @property
+    def sender_address(self):
+        """Adresse de l'expéditeur, sans le nom affiché, en minuscules"""
+        if self._sender_address is None:
+            self._sender_address = _sender_address(self.data['sender'])
+        return self._sender_address
+
+    @property
+    def sender_domain(self):
+        """Domaine de l'adresse de l'expéditeur ('' si absent)"""
+        if self._sender_domain is None:
+            self._sender_domain = self.sender_address.rpartition('@')[2] if '@' in self.sender_address else ''
+        return self._sender_domain
+
+    @property
+    def links(self):
+        """Liens vers des offres d'emploi trouvés dans le corps"""
+        if self._links is None:
+            self._links = get_rule_engine().extract_links(self.data.get('body', ''))
+        return self._links
+
+
+def as_record(email):
+    """Renvoie l'email sous forme d'EmailRecord (sans copie s'il en est déjà un)"""
+    return email if isinstance(email, EmailRecord) else EmailRecord(email)
+
+
+class RuleEngine:
+    """Règles de filtrage, de catégorisation et de résumé compilées une seule fois"""
+
+    def __init__(self, blocked_senders=BLOCKED_SENDERS, promo_keywords=PROMO_KEYWORDS, categories=CATEGORIES,
+                 company_cache_file=COMPANY_CACHE_FILE):
+        self.sender_index = SenderIndex(blocked_senders)
+        self.promo_matcher = KeywordMatcher(promo_keywords)
+
+        # Les mots-clés sont rangés dans l'ordre des catégories : le premier
+        # trouvé donne la catégorie la plus prioritaire
+        self.category_names = list(categories)
+        category_keywords = []
+        self.keyword_category = []
+        for index, category in enumerate(self.category_names):
+            for keyword in categories[category]['keywords']:
+                category_keywords.append(keyword)
+                self.keyword_category.append(index)
+        self.category_matcher = KeywordMatcher(category_keywords)
+
+        # Une seule alternative pour tous les motifs de newsletter
+        self.newsletter_re = re.compile('|'.join(f'(?:{pattern})' for pattern in NEWSLETTER_PATTERNS))
+        self.link_extractor = LinkExtractor(JOB_DOMAINS, MAX_JOB_LINKS)
+        self.company_extractor = CompanyExtractor(company_cache_file, JOB_DOMAINS)
+        self.footer_res = [re.compile(pattern, re.IGNORECASE | re.DOTALL) for pattern in FOOTER_PATTERNS]
+
+        # Empreinte de tout ce qui influence le résultat de classify()
+        ruleset = {
+            'version': RULESET_VERSION,
+            'blocked_senders': list(blocked_senders),
+            'promo_keywords': list(promo_keywords),
+            'categories': {name: list(categories[name]['keywords']) for name in self.category_names},
+            'newsletter_patterns': NEWSLETTER_PATTERNS,
+            'job_domains': JOB_DOMAINS,
+            'company_patterns': COMPANY_PATTERNS,
+            'max_job_links': MAX_JOB_LINKS,
+            'body_chars': [PROMO_BODY_CHARS, CATEGORY_BODY_CHARS, SUMMARY_BODY_CHARS],
+        }
+        self.fingerprint = hashlib.sha256(
+            json.dumps(ruleset, ensure_ascii=False, sort_keys=True).encode('utf-8')
+        ).hexdigest()[:16]
+
+    def is_promotional(self, email):
+        """Vérifie si un email est une promotion commerciale ou newsletter automatique"""
+        email = as_record(email)
+
+        # Vérifier les expéditeurs bloqués
+        if self.sender_index.matches(email.sender_address):
+            return True
 
+        # Vérifier les mots-clés de promotion
+        text_to_check = email.promo_text
+        if len(self.promo_matcher.find_all(text_to_check)) >= 2:
+            return True
 
-def is_promotional_email(email):
-    """Vérifie si un email est une promotion commerciale ou newsletter automatique"""
-    sender_lower = email['sender'].lower()
-    subject_lower = email['subject'].lower()
-    body_lower = email.get('body', '').lower()[:500]
+        # Détecter les alertes emploi automatiques
+        return self.newsletter_re.search(text_to_check) is not None
 
-    # Vérifier les expéditeurs bloqués
-    for blocked in BLOCKED_SENDERS:
-        if blocked.lower() in sender_lower:
-            return True
+    def categorize(self, email):
+        """Catégorise un email selon son contenu"""
+        first = self.category_matcher.find_first(as_record(email).category_text)
+        if first is None:
+            return None
+        return self.category_names[self.keyword_category[first]]
 
-    # Vérifier les mots-clés de promotion
-    text_to_check = subject_lower + " " + body_lower
-    promo_count = sum(1 for kw in PROMO_KEYWORDS if kw.lower() in text_to_check)
-
-    if promo_count >= 2:
-        return True
-
-    # Détecter les alertes emploi automatiques
-    newsletter_patterns = [
-        r"alerte.*emploi",
-        r"job.*alert",
-        r"\d+\s+autres?\s+emplois?",
-        r"\d+\s+nouveaux?\s+emplois?",
-        r"postulez maintenant.*et\s+\d+",
-        r"pour\s+\w+\s+vous\s+attendent",
-        r"nouvelle[s]?\s+offre[s]?\s+d'emploi\s+rien\s+que\s+pour\s+vous",
-        r"jobs?\s+posted\s+from",
-        r"new\s+jobs?\s+from",
-    ]
+    def extract_links(self, body):
+        """Extrait les liens vers des offres d'emploi (ordre d'apparition, sans doublons)"""
+        return self.link_extractor.extract(body)
 
-    for pattern in newsletter_patterns:
-        if re.search(pattern, text_to_check):
-            return True
+    def summarize(self, email):
+        """Crée un résumé d'un email"""
+        email = as_record(email)
 
-    return False
+        summary = {
+            'compte': email['account'],
+            'de': email['sender'],
+            'objet': email['subject'],
+            'date': email['date'],
+            'liens': email.links
+        }
 
+        company = self.company_extractor.extract(email.summary_text, email.sender_address)
+        if company:
+            summary['entreprise'] = company
 
-def extract_links_from_email(body):
-    """Extrait les liens d'un email"""
-    url_pattern = r'https?://[^\s<>"\']+(?:\([^\s<>"\']*\)|[^\s<>"\'\)\]])+'
-    links = re.findall(url_pattern, body)
+        return summary
 
-    job_domains = [
-        'linkedin.com/jobs', 'indeed.com', 'glassdoor.com', 'welcometothejungle.com',
-        'hellowork.com', 'apec.fr', 'cadremploi.fr', 'monster.fr', 'talent.io',
-        'jobs2web.com', 'workday.com', 'greenhouse.io', 'lever.co', 'smartrecruiters.com'
-    ]
+    def classify(self, email):
+        """Filtre, catégorise et résume un email.
 
-    job_links = []
-    for link in links:
-        link_lower = link.lower()
-        if any(domain in link_lower for domain in job_domains):
-            job_links.append(link)
-        elif '/job' in link_lower or '/career' in link_lower or '/emploi' in link_lower:
-            job_links.append(link)
+        Renvoie (promotionnel, catégorie, résumé) ; le résumé n'est calculé
+        que pour un email non promotionnel et catégorisé.
+        """
+        email = as_record(email)
+        if self.is_promotional(email):
+            return True, None, None
+        category = self.categorize(email)
+        if category is None:
+            return False, None, None
+        return False, category, self.summarize(email)
 
-    return list(set(job_links))
+    def clean_body(self, body):
+        """Nettoie le contenu HTML d'un email pour le rendre lisible"""
+        if not body:
+            return "(Aucun contenu disponible)"
 
+        # Conversion en une passe, arrêtée dès que le texte suffit à l'affichage
+        clean = html_to_text(body, MAX_CLEAN_BODY_CHARS + CLEAN_BODY_MARGIN)
 
-def categorize_email(email):
-    """Catégorise un email selon son contenu"""
-    subject_lower = email['subject'].lower()
-    body_lower = email.get('body', '').lower()[:1000]
-    text_to_check = subject_lower + " " + body_lower
+        # Supprimer les footers
+        for pattern in self.footer_res:
+            clean = pattern.sub('', clean)
+
+        clean = clean.strip()
+
+        if len(clean) > MAX_CLEAN_BODY_CHARS:
+            clean = clean[:MAX_CLEAN_BODY_CHARS] + "\n\n[... contenu tronqué ...]"
+
+        return clean if clean else "(Contenu vide après nettoyage)"
 
-    for category, config in CATEGORIES.items():
-        for keyword in config['keywords']:
-            if keyword.lower() in text_to_check:
-                return category
 
-    return None
+_engine = None
+
+
+def get_rule_engine():
+    """Moteur de règles partagé, construit au premier appel"""
+    global _engine
+    if _engine is None:
+        _engine = RuleEngine()
+    return _engine
+
+
+def is_promotional_email(email):
+    """Vérifie si un email est une promotion commerciale ou newsletter automatique"""
+    return get_rule_engine().is_promotional(email)
+
+
+def is_promotional_header(email):
+    """Pré-filtre sur l'expéditeur et l'objet seuls, avant de télécharger le corps.
+
+    L'objet est un préfixe du texte analysé par is_promotional_email : un email
+    rejeté ici l'est aussi une fois son corps connu.
+    """
+    return is_promotional_email({'sender': email['sender'], 'subject': email['subject'], 'body': ''})
+
+
+def extract_links_from_email(body):
+    """Extrait les liens d'un email"""
+    return get_rule_engine().extract_links(body)
+
+
+def categorize_email(email):
+    """Catégorise un email selon son contenu"""
+    return get_rule_engine().categorize(email)
 
 
 def create_email_summary(email):
     """Crée un résumé d'un email"""
-    body = email.get('body', '')
-
-    summary = {
-        'compte': email['account'],
-        'de': email['sender'],
-        'objet': email['subject'],
-        'date': email['date'],
-        'liens': extract_links_from_email(body)
-    }
-
-    company_patterns = [
-        r'(?:chez|at|@)\s+([A-Z][A-Za-z\s&]+?)(?:\s+recrute|\s+recherche|\.|\,)',
-        r'([A-Z][A-Za-z\s&]+?)\s+recrute',
+    return get_rule_engine().summarize(email)
+
+
+def _classify_chunk(emails):
+    """Classifie une tranche d'emails (exécuté dans un processus de travail)"""
+    engine = get_rule_engine()
+    return [engine.classify(email) for email in emails]
+
+
+def _chunked(emails, chunk_size):
+    """Découpe un flux d'emails en tranches de `chunk_size` EmailRecord"""
+    chunk = []
+    for email in emails:
+        chunk.append(as_record(email))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _payload(emails):
+    """Seuls les champs lus par les règles sont envoyés aux processus"""
+    return [{field: email.get(field, '') for field in CLASSIFY_FIELDS} for email in emails]
+
+
+def _classify_chunks(chunks, parallel_after, max_workers):
+    """Classifie des tranches d'emails ; génère (tranche, résultats) dans l'ordre.
+
+    Les résultats en cache ne sont pas recalculés. Dès que `parallel_after`
+    emails ont été lus (None : jamais), les tranches suivantes sont réparties
+    sur un ProcessPoolExecutor, avec au plus deux tranches en cours par
+    processus : la mémoire reste bornée même pour un flux sans fin.
+    """
+    engine = get_rule_engine()
+    cache = get_classification_cache(engine.fingerprint)
+    workers = max_workers or os.cpu_count() or 1
+    executor = None
+    parallel = parallel_after is not None
+    in_flight = deque()
+    seen = 0
+
+    def complete(chunk, keys, cached, todo, computed):
+        """Attend le calcul d'une tranche, met le cache à jour et fusionne les résultats"""
+        nonlocal parallel
+        if isinstance(computed, Future):
+            try:
+                computed = computed.result()
+            except (OSError, BrokenProcessPool) as e:
+                if parallel:
+                    print(f"⚠️  Classification parallèle impossible ({e}), traitement séquentiel")
+                    parallel = False
+                computed = _classify_chunk([chunk[i] for i in todo])
+        if cache:
+            cache.put_many([(keys[i], result) for i, result in zip(todo, computed) if keys[i][1]])
+
+        results = [cached.get(key) for key in keys]
+        for i, result in zip(todo, computed):
+            results[i] = result
+
+        # Le cache ne garde pas l'entreprise : elle est recalculée avec les
+        # domaines connus de cette exécution
+        fresh = set(todo)
+        for i, (email, result) in enumerate(zip(chunk, results)):
+            summary = result[2]
+            if i not in fresh and summary is not None:
+                company = engine.company_extractor.extract(email.summary_text, email.sender_address)
+                if company:
+                    summary['entreprise'] = company
+
+        for email, key, (_, _, summary) in zip(chunk, keys, results):
+            if summary is not None:
+                # Les liens du résumé servent aussi à la vue détaillée
+                email._links = summary['liens']
+                # Apprentissage dans le processus principal, pour les exécutions suivantes
+                if 'entreprise' in summary:
+                    email_key = f"{key[0]}/{key[1]}" if key[1] else None
+                    engine.company_extractor.learn(email.sender_address, summary['entreprise'], email_key)
+        return chunk, results
+
+    try:
+        for chunk in chunks:
+            seen += len(chunk)
+            # Résultats déjà calculés avec les mêmes règles
+            keys = [(email.get('account', ''), email.get('id')) for email in chunk]
+            cached = cache.get_many([key for key in keys if key[1]]) if cache else {}
+            todo = [i for i, key in enumerate(keys) if key not in cached]
+            pending = [chunk[i] for i in todo]
+
+            if parallel and pending and seen >= parallel_after:
+                if executor is None:
+                    executor = ProcessPoolExecutor(max_workers=workers)
+                try:
+                    computed = executor.submit(_classify_chunk, _payload(pending))
+                except (OSError, BrokenProcessPool, RuntimeError) as e:
+                    print(f"⚠️  Classification parallèle impossible ({e}), traitement séquentiel")
+                    parallel = False
+                    computed = _classify_chunk(pending)
+            else:
+                computed = _classify_chunk(pending)
+            in_flight.append((chunk, keys, cached, todo, computed))
+
+            # Les résultats sont rendus dans l'ordre, sans accumuler de tranches
+            while in_flight and (len(in_flight) > 2 * workers or not isinstance(in_flight[0][4], Future)):
+                yield complete(*in_flight.popleft())
+
+        while in_flight:
+            yield complete(*in_flight.popleft())
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def classify_batch(emails, chunk_size=CLASSIFY_CHUNK_SIZE, threshold=CLASSIFY_PARALLEL_THRESHOLD,
+                   max_workers=CLASSIFY_MAX_WORKERS):
+    """Classifie une liste d'emails : (promotionnel, catégorie, résumé) pour chacun.
+
+    À partir de `threshold` emails, les tranches de `chunk_size` emails sont
+    réparties sur un ProcessPoolExecutor. Les résultats sont renvoyés dans
+    l'ordre des emails et identiques à ceux du traitement séquentiel.
+    """
+    emails = list(emails)
+    parallel_after = 0 if len(emails) >= threshold else None
+    return [
+        result
+        for _, results in _classify_chunks(_chunked(emails, chunk_size), parallel_after, max_workers)
+        for result in results
     ]
 
-    for pattern in company_patterns:
-        match = re.search(pattern, email['subject'] + ' ' + body[:500])
-        if match:
-            summary['entreprise'] = match.group(1).strip()
-            break
 
-    return summary
+def classify_stream(emails, chunk_size=CLASSIFY_CHUNK_SIZE, threshold=CLASSIFY_PARALLEL_THRESHOLD,
+                    max_workers=CLASSIFY_MAX_WORKERS):
+    """Classifie un flux d'emails : génère (EmailRecord, résultat) dans l'ordre du flux.
 
+    Les emails sont lus par tranches de `chunk_size`. Au-delà de `threshold`
+    emails (rattrapage de plusieurs mois), les tranches suivantes sont
+    réparties sur un ProcessPoolExecutor.
+    """
+    for chunk, results in _classify_chunks(_chunked(emails, chunk_size), threshold, max_workers):
+        yield from zip(chunk, results)
 
-def clean_email_body(body):
-    """Nettoie le contenu HTML d'un email pour le rendre lisible"""
-    if not body:
-        return "(Aucun contenu disponible)"
-
-    # Supprimer les blocs style, script, head
-    clean = re.sub(r'<style[^>]*>.*?</style>', '', body, flags=re.DOTALL | re.IGNORECASE)
-    clean = re.sub(r'<script[^>]*>.*?</script>', '', clean, flags=re.DOTALL | re.IGNORECASE)
-    clean = re.sub(r'<head[^>]*>.*?</head>', '', clean, flags=re.DOTALL | re.IGNORECASE)
-    clean = re.sub(r'<!--.*?-->', '', clean, flags=re.DOTALL)
-
-    # Supprimer les attributs style inline
-    clean = re.sub(r'\s+style="[^"]*"', '', clean, flags=re.IGNORECASE)
-    clean = re.sub(r'\s+class="[^"]*"', '', clean, flags=re.IGNORECASE)
-
-    # Remplacer les balises par des retours à la ligne
-    clean = re.sub(r'<br\s*/?>', '\n', clean, flags=re.IGNORECASE)
-    clean = re.sub(r'</p>', '\n\n', clean, flags=re.IGNORECASE)
-    clean = re.sub(r'</div>', '\n', clean, flags=re.IGNORECASE)
-    clean = re.sub(r'</tr>', '\n', clean, flags=re.IGNORECASE)
-    clean = re.sub(r'</li>', '\n', clean, flags=re.IGNORECASE)
-    clean = re.sub(r'<li[^>]*>', '  • ', clean, flags=re.IGNORECASE)
-    clean = re.sub(r'<h[1-6][^>]*>', '\n\n▶ ', clean, flags=re.IGNORECASE)
-    clean = re.sub(r'</h[1-6]>', '\n', clean, flags=re.IGNORECASE)
-
-    # Supprimer les autres balises HTML
-    clean = re.sub(r'<[^>]+>', ' ', clean)
-
-    # Décoder les entités HTML
-    html_entities = {
-        '&nbsp;': ' ', '&amp;': '&', '&lt;': '<', '&gt;': '>',
-        '&quot;': '"', '&#39;': "'", '&apos;': "'",
-        '&euro;': '€', '&copy;': '©', '&reg;': '®',
-        '&#160;': ' ', '&#8217;': "'", '&#8220;': '"', '&#8221;': '"',
-        '&rsquo;': "'", '&lsquo;': "'", '&rdquo;': '"', '&ldquo;': '"',
-        '&ndash;': '–', '&mdash;': '—', '&bull;': '•',
-    }
-    for entity, char in html_entities.items():
-        clean = clean.replace(entity, char)
-
-    clean = re.sub(r'&#(\d+);', lambda m: chr(int(m.group(1))) if int(m.group(1)) < 65536 else '', clean)
-
-    # Nettoyer les espaces
-    clean = re.sub(r'[ \t]+', ' ', clean)
-    clean = re.sub(r'\n[ \t]+', '\n', clean)
-    clean = re.sub(r'[ \t]+\n', '\n', clean)
-    clean = re.sub(r'\n{3,}', '\n\n', clean)
-
-    # Supprimer les footers
-    footer_patterns = [
-        r'Commercial Register.*$',
-        r'Managing Directors?:.*$',
-        r'District Court.*$',
-        r'@media\s*\([^)]+\)\s*\{[^}]+\}',
-        r'\{[^}]*font-size[^}]*\}',
-    ]
-    for pattern in footer_patterns:
-        clean = re.sub(pattern, '', clean, flags=re.IGNORECASE | re.DOTALL)
 
-    clean = clean.strip()
+def save_company_cache():
+    """Enregistre les entreprises associées aux domaines des expéditeurs"""
+    get_rule_engine().company_extractor.save()
 
-    if len(clean) > 3000:
-        clean = clean[:3000] + "\n\n[... contenu tronqué ...]"
 
-    return clean if clean else "(Contenu vide après nettoyage)"
+def get_classification_stats():
+    """(emails trouvés dans le cache de classification, emails recalculés, taux de succès), ou None"""
+    cache = get_classification_cache(get_rule_engine().fingerprint)
+    return (cache.hits, cache.misses, cache.hit_rate()) if cache else None
+
+
+def clean_email_body(body):
+    """Nettoie le contenu HTML d'un email pour le rendre lisible"""
+    return get_rule_engine().clean_body(body)
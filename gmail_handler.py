@@ -3,19 +3,50 @@ Gestion des emails Gmail
 """
 
 import os
+import json
 import pickle
 import base64
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-from config import GMAIL_SCOPES, START_DATE_GMAIL
+# Les bibliothèques Google sont importées à la demande : le démarrage reste
+# rapide et elles ne sont chargées que si un compte Gmail est configuré
 
+from config import (
+    GMAIL_SCOPES, GMAIL_DISCOVERY_FILE, START_DATE_GMAIL, GMAIL_INCREMENTAL_SYNC, GMAIL_PAGE_SIZE,
+    GMAIL_BATCH_SIZE, GMAIL_BATCH_CONCURRENCY, GMAIL_MAX_BODY_BYTES, TWO_PHASE_FETCH,
+    GMAIL_QUOTA_UNITS_PER_SEC
+)
+from filters import is_promotional_header
+from message_cache import get_message_cache
+from rate_limiter import RETRYABLE_STATUSES, get_scheduler, parse_retry_after
 
-def get_gmail_service(token_file):
-    """Connexion à l'API Gmail"""
-    creds = None
-    if os.path.exists(token_file):
+# En-têtes demandés lors de la première phase (format 'metadata')
+METADATA_HEADERS = ['Subject', 'From', 'Date']
+
+# Coût en unités de quota des méthodes de l'API Gmail utilisées
+QUOTA_GET = 5
+QUOTA_LIST = 5
+QUOTA_HISTORY = 2
+QUOTA_PROFILE = 1
+
+
+GMAIL_DISCOVERY_URL = "https://gmail.googleapis.com/$discovery/rest?version=v1"
+
+# Caches du processus, indexés par token_file
+_credentials = {}
+_services = {}
+_services_lock = threading.Lock()
+_discovery_document = None
+
+
+def _load_credentials(token_file):
+    """Charge (et rafraîchit si besoin) les identifiants OAuth d'un compte"""
+    from google.auth.transport.requests import Request
+    from google_auth_oauthlib.flow import InstalledAppFlow
+
+    creds = _credentials.get(token_file)
+    if creds is None and os.path.exists(token_file):
         with open(token_file, 'rb') as token:
             creds = pickle.load(token)
 
@@ -28,48 +59,360 @@ def get_gmail_service(token_file):
         with open(token_file, 'wb') as token:
             pickle.dump(creds, token)
 
-    return build('gmail', 'v1', credentials=creds)
+    _credentials[token_file] = creds
+    return creds
+
+
+def _load_discovery_document():
+    """Document de découverte de l'API Gmail, mis en cache dans un fichier local"""
+    global _discovery_document
+    if _discovery_document is not None:
+        return _discovery_document
+
+    if os.path.exists(GMAIL_DISCOVERY_FILE):
+        with open(GMAIL_DISCOVERY_FILE, 'r', encoding='utf-8') as f:
+            _discovery_document = f.read()
+        return _discovery_document
 
+    # Premier lancement : document embarqué dans googleapiclient, sinon téléchargé
+    from googleapiclient.discovery_cache import get_static_doc
+    document = get_static_doc('gmail', 'v1')
+    if document is None:
+        import httplib2
+        _, content = httplib2.Http().request(GMAIL_DISCOVERY_URL)
+        document = content.decode('utf-8')
+
+    with open(GMAIL_DISCOVERY_FILE, 'w', encoding='utf-8') as f:
+        f.write(document)
+    _discovery_document = document
+    return document
+
+
+def _get_scheduler(token_file):
+    """Planificateur de requêtes d'un compte Gmail (le quota est par utilisateur)"""
+    return get_scheduler(f"gmail:{token_file}", GMAIL_QUOTA_UNITS_PER_SEC)
+
+
+def _classify_http_error(error):
+    """Renvoie (réessayable, retry_after) pour une erreur levée par l'API Gmail"""
+    resp = getattr(error, 'resp', None)
+    if resp is None:
+        # Erreur réseau (connexion coupée, délai dépassé...)
+        return isinstance(error, OSError), None
+
+    status = int(resp.status)
+    # Gmail signale aussi les dépassements de quota par un 403
+    if status == 403 and 'ratelimitexceeded' in str(error).lower():
+        return True, parse_retry_after(resp.get('retry-after'))
+    return status in RETRYABLE_STATUSES, parse_retry_after(resp.get('retry-after'))
+
+
+def _execute(scheduler, request, units, http=None):
+    """Exécute une requête de l'API Gmail en respectant le quota du compte"""
+    return scheduler.call(lambda: request.execute(http=http), units, _classify_http_error)
+
+
+def get_gmail_service(token_file):
+    """Connexion à l'API Gmail (service construit une seule fois par token_file)"""
+    from googleapiclient.discovery import build_from_document
 
-def get_gmail_message_content(service, msg_id):
-    """Récupère le contenu complet d'un email Gmail"""
-    message = service.users().messages().get(userId='me', id=msg_id, format='full').execute()
+    with _services_lock:
+        service = _services.get(token_file)
+        if service is None:
+            creds = _load_credentials(token_file)
+            service = build_from_document(_load_discovery_document(), credentials=creds)
+            _services[token_file] = service
+    return service
 
+
+def _iter_body_parts(part):
+    """Parcourt récursivement les parties MIME (multipart/* imbriqués compris)"""
+    if 'parts' in part:
+        for sub_part in part['parts']:
+            yield from _iter_body_parts(sub_part)
+    elif not part.get('filename') and part.get('body', {}).get('data'):
+        yield part
+
+
+def _select_body_part(payload):
+    """Choisit la meilleure partie texte : text/plain en priorité, sinon text/html"""
+    if 'parts' not in payload:
+        return payload if payload.get('body', {}).get('data') else None
+
+    html_part = None
+    for part in _iter_body_parts(payload):
+        mime_type = part.get('mimeType', '')
+        if mime_type == 'text/plain':
+            return part
+        if mime_type == 'text/html' and html_part is None:
+            html_part = part
+    return html_part
+
+
+def _decode_body_data(data, max_bytes=None):
+    """Décode des données base64url, en ne décodant que les `max_bytes` premiers octets"""
+    if max_bytes is not None:
+        # 4 caractères base64 codent 3 octets : on coupe sur un multiple de 4
+        data = data[:-(-max_bytes // 3) * 4]
+    return base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
+
+
+def get_full_body(email):
+    """Renvoie le corps complet d'un email, en décodant la version brute si le corps a été tronqué"""
+    raw_body = email.get('raw_body')
+    if raw_body:
+        return _decode_body_data(raw_body)
+    return email.get('body', '')
+
+
+def _parse_gmail_message(message, msg_id):
+    """Extrait sujet, expéditeur, date et corps d'un message Gmail"""
     headers = message.get('payload', {}).get('headers', [])
     subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '')
     sender = next((h['value'] for h in headers if h['name'] == 'From'), 'Inconnu')
     date = next((h['value'] for h in headers if h['name'] == 'Date'), '')
 
-    body = ""
-    payload = message.get('payload', {})
-
-    if 'parts' in payload:
-        for part in payload['parts']:
-            if part['mimeType'] == 'text/plain':
-                data = part['body'].get('data', '')
-                if data:
-                    body = base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
-                    break
-            elif part['mimeType'] == 'text/html':
-                data = part['body'].get('data', '')
-                if data:
-                    body = base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
-    else:
-        data = payload.get('body', {}).get('data', '')
-        if data:
-            body = base64.urlsafe_b64decode(data).decode('utf-8', errors='ignore')
-
-    return {
+    email_data = {
         'subject': subject,
         'sender': sender,
         'date': date,
-        'body': body,
+        'body': "",
         'id': msg_id
     }
 
+    part = _select_body_part(message.get('payload', {}))
+    if part:
+        data = part['body']['data']
+        email_data['body'] = _decode_body_data(data, GMAIL_MAX_BODY_BYTES)
+        # Corps tronqué : les données brutes restent disponibles pour la vue détaillée
+        # (taille décodée : 3 octets par groupe de 4 caractères, remplissage '=' exclu)
+        if len(data.rstrip('=')) * 3 // 4 > GMAIL_MAX_BODY_BYTES:
+            email_data['raw_body'] = data
+
+    return email_data
+
+
+def get_gmail_message_content(service, msg_id, account_name=None, scheduler=None):
+    """Récupère le contenu complet d'un email Gmail (depuis le cache local si possible)"""
+    cache = get_message_cache() if account_name else None
+    if cache:
+        cached = cache.get(account_name, msg_id)
+        if cached:
+            return cached
+
+    scheduler = scheduler or get_scheduler('gmail', GMAIL_QUOTA_UNITS_PER_SEC)
+    request = service.users().messages().get(userId='me', id=msg_id, format='full')
+    message = _execute(scheduler, request, QUOTA_GET)
+    email_data = _parse_gmail_message(message, msg_id)
+
+    if cache:
+        cache.put(account_name, email_data)
+    return email_data
+
+
+def _new_authorized_http(service):
+    """Crée un client HTTP dédié au thread courant (httplib2 n'est pas thread-safe)"""
+    import httplib2
+    from google_auth_httplib2 import AuthorizedHttp
+    return AuthorizedHttp(service._http.credentials, http=httplib2.Http())
+
+
+def _message_request(service, msg_id, fmt):
+    """Requête messages().get au format 'full' ou 'metadata' (en-têtes seuls)"""
+    if fmt == 'metadata':
+        return service.users().messages().get(
+            userId='me', id=msg_id, format='metadata', metadataHeaders=METADATA_HEADERS
+        )
+    return service.users().messages().get(userId='me', id=msg_id, format='full')
+
+
+def _fetch_gmail_batch(service, msg_ids, scheduler, http=None, fmt='full'):
+    """Récupère un lot d'emails Gmail en une seule requête batch.
+
+    Seuls les messages en échec temporaire (429, 5xx, quota) sont renvoyés
+    dans un nouveau batch, après un délai ; un échec définitif n'écarte que
+    le message concerné.
+    """
+    results = {}
+    pending = list(msg_ids)
+    attempt = 0
+
+    while pending:
+        retry = []
+        retry_after = []
+
+        def on_response(request_id, response, exception):
+            if exception is None:
+                results[request_id] = _parse_gmail_message(response, request_id)
+                return
+            retryable, delay = _classify_http_error(exception)
+            if retryable:
+                retry.append(request_id)
+                if delay is not None:
+                    retry_after.append(delay)
+            else:
+                print(f"   ⚠️ Email {request_id} ignoré: {exception}")
+
+        batch = service.new_batch_http_request(callback=on_response)
+        for msg_id in pending:
+            batch.add(_message_request(service, msg_id, fmt), request_id=msg_id)
+
+        scheduler.acquire(QUOTA_GET * len(pending))
+        try:
+            batch.execute(http=http)
+        except Exception as e:
+            retryable, delay = _classify_http_error(e)
+            if not retryable:
+                print(f"   ⚠️ Échec du batch Gmail ({len(pending)} emails): {e}")
+                break
+            retry = [msg_id for msg_id in pending if msg_id not in results]
+            if delay is not None:
+                retry_after.append(delay)
+
+        if retry and attempt >= scheduler.max_retries:
+            print(f"   ⚠️ {len(retry)} emails ignorés après {attempt + 1} tentatives")
+            break
+        if retry:
+            scheduler.wait_before_retry(attempt, max(retry_after) if retry_after else None)
+            attempt += 1
+        pending = retry
+
+    return [results[msg_id] for msg_id in msg_ids if msg_id in results]
+
+
+def _fetch_gmail_batches(service, msg_ids, scheduler, fmt='full'):
+    """Récupère des emails Gmail par lots, en parallèle. Renvoie {id: email}"""
+    chunks = [msg_ids[i:i + GMAIL_BATCH_SIZE] for i in range(0, len(msg_ids), GMAIL_BATCH_SIZE)]
+
+    if GMAIL_BATCH_CONCURRENCY <= 1 or len(chunks) <= 1:
+        batches = [_fetch_gmail_batch(service, chunk, scheduler, fmt=fmt) for chunk in chunks]
+    else:
+        # Un client HTTP par thread de travail, réutilisé d'un lot à l'autre
+        # (connexion et session TLS conservées)
+        local = threading.local()
+
+        def fetch_chunk(chunk):
+            http = getattr(local, 'http', None)
+            if http is None:
+                http = local.http = _new_authorized_http(service)
+            return _fetch_gmail_batch(service, chunk, scheduler, http, fmt)
+
+        with ThreadPoolExecutor(max_workers=GMAIL_BATCH_CONCURRENCY) as executor:
+            batches = list(executor.map(fetch_chunk, chunks))
+
+    return {email['id']: email for batch in batches for email in batch}
+
+
+def fetch_gmail_messages(service, msg_ids, account_name=None, scheduler=None):
+    """Récupère le contenu de plusieurs emails Gmail par lots, en parallèle.
+
+    Les emails déjà présents dans le cache local ne sont pas retéléchargés.
+    Avec TWO_PHASE_FETCH, seuls les en-têtes sont d'abord récupérés : les
+    emails rejetés par le pré-filtre sont renvoyés sans corps.
+    """
+    scheduler = scheduler or get_scheduler('gmail', GMAIL_QUOTA_UNITS_PER_SEC)
+    cache = get_message_cache() if account_name else None
+    cached = cache.get_many(account_name, msg_ids) if cache else {}
+    missing = [msg_id for msg_id in msg_ids if msg_id not in cached]
+
+    rejected = {}
+    if TWO_PHASE_FETCH and missing:
+        headers_only = _fetch_gmail_batches(service, missing, scheduler, fmt='metadata')
+        rejected = {msg_id: email for msg_id, email in headers_only.items() if is_promotional_header(email)}
+        missing = [msg_id for msg_id in missing if msg_id not in rejected]
+
+    fetched = _fetch_gmail_batches(service, missing, scheduler)
+    if cache:
+        cache.put_many(account_name, fetched.values())
+
+    emails = []
+    for msg_id in msg_ids:
+        email_data = cached.get(msg_id) or fetched.get(msg_id) or rejected.get(msg_id)
+        if email_data:
+            emails.append(email_data)
+    return emails
+
+
+def _iter_gmail_message_ids(service, query, scheduler):
+    """Parcourt toutes les pages de messages().list et renvoie les IDs page par page"""
+    page_token = None
+    while True:
+        request = service.users().messages().list(
+            userId='me', q=query, maxResults=GMAIL_PAGE_SIZE, pageToken=page_token
+        )
+        results = _execute(scheduler, request, QUOTA_LIST)
+        msg_ids = [msg['id'] for msg in results.get('messages', [])]
+        if msg_ids:
+            yield msg_ids
+
+        page_token = results.get('nextPageToken')
+        if not page_token:
+            break
+
+
+def _history_file(token_file):
+    """Chemin du checkpoint historyId associé à un token_file"""
+    return os.path.splitext(token_file)[0] + '_history.json'
+
+
+def _load_history_id(token_file):
+    """Lit le dernier historyId synchronisé pour ce compte (None si absent)"""
+    history_file = _history_file(token_file)
+    if not os.path.exists(history_file):
+        return None
+    try:
+        with open(history_file, 'r', encoding='utf-8') as f:
+            return json.load(f).get('historyId')
+    except (OSError, ValueError):
+        return None
+
+
+def _save_history_id(token_file, history_id):
+    """Sauvegarde le historyId atteint à la fin d'une synchronisation"""
+    with open(_history_file(token_file), 'w', encoding='utf-8') as f:
+        json.dump({'historyId': history_id}, f)
+
+
+def _iter_gmail_history_ids(service, start_history_id, fallback, scheduler):
+    """Parcourt les messages ajoutés depuis start_history_id (users.history.list).
+
+    Si le historyId a expiré (HTTP 404), bascule sur le générateur `fallback`.
+    """
+    from googleapiclient.errors import HttpError
+
+    page_token = None
+    seen = set()
+    while True:
+        try:
+            request = service.users().history().list(
+                userId='me', startHistoryId=start_history_id, historyTypes=['messageAdded'],
+                maxResults=GMAIL_PAGE_SIZE, pageToken=page_token
+            )
+            results = _execute(scheduler, request, QUOTA_HISTORY)
+        except HttpError as e:
+            if e.resp.status == 404 and page_token is None:
+                print("   ℹ️  historyId expiré: retour à la recherche par date")
+                yield from fallback
+                return
+            raise
+
+        msg_ids = []
+        for record in results.get('history', []):
+            for added in record.get('messagesAdded', []):
+                msg_id = added['message']['id']
+                if msg_id not in seen:
+                    seen.add(msg_id)
+                    msg_ids.append(msg_id)
+        if msg_ids:
+            yield msg_ids
+
+        page_token = results.get('nextPageToken')
+        if not page_token:
+            break
+
 
 def fetch_gmail_emails(account):
-    """Récupère les emails d'un compte Gmail"""
+    """Récupère les emails d'un compte Gmail (générateur, page par page)"""
     token_file = account["token_file"]
     account_name = account["name"]
 
@@ -77,24 +420,33 @@ def fetch_gmail_emails(account):
 
     try:
         service = get_gmail_service(token_file)
-        profile = service.users().getProfile(userId='me').execute()
+        scheduler = _get_scheduler(token_file)
+        profile = _execute(scheduler, service.users().getProfile(userId='me'), QUOTA_PROFILE)
         email_address = profile.get('emailAddress', account_name)
+        print(f"   ✅ Connecté à {email_address}")
 
         query = f"after:{START_DATE_GMAIL}"
-        results = service.users().messages().list(userId='me', q=query, maxResults=200).execute()
-        messages = results.get('messages', [])
+        pages = _iter_gmail_message_ids(service, query, scheduler)
 
-        print(f"   ✅ Connecté à {email_address} - {len(messages)} emails trouvés")
+        if GMAIL_INCREMENTAL_SYNC:
+            start_history_id = _load_history_id(token_file)
+            if start_history_id:
+                print(f"   🔁 Synchronisation incrémentale depuis historyId {start_history_id}")
+                pages = _iter_gmail_history_ids(service, start_history_id, pages, scheduler)
 
-        emails = []
-        for msg in messages:
-            email_data = get_gmail_message_content(service, msg['id'])
-            email_data['account'] = account_name
-            email_data['email_address'] = email_address
-            emails.append(email_data)
+        count = 0
+        for msg_ids in pages:
+            for email_data in fetch_gmail_messages(service, msg_ids, account_name, scheduler):
+                email_data['account'] = account_name
+                email_data['email_address'] = email_address
+                count += 1
+                yield email_data
+
+        print(f"   📥 [{account_name}] {count} emails récupérés")
 
-        return emails
+        # Checkpoint pris avant le listing : rien n'est perdu entre deux exécutions
+        if GMAIL_INCREMENTAL_SYNC and profile.get('historyId'):
+            _save_history_id(token_file, profile['historyId'])
 
     except Exception as e:
         print(f"   ❌ Erreur Gmail [{account_name}]: {e}")
-        return []
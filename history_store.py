@@ -0,0 +1,321 @@
+"""
+Historique des emails classés, exécution après exécution (SQLite, mode WAL)
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from config import CATEGORIES, HISTORY_DB_FILE
+
+
+def _iso_date(date):
+    """Date d'un email au format ISO 8601 (en-tête RFC 2822 Gmail ou date Graph), '' si illisible"""
+    if not date:
+        return ''
+    try:
+        return parsedate_to_datetime(date).isoformat()
+    except (TypeError, ValueError, IndexError):
+        return date if date[:4].isdigit() else ''
+
+
+# Clé d'un email dans l'index plein texte : minutes écoulées depuis 2000 (UTC) dans les bits
+# de poids fort, rowid de la table emails dans les bits de poids faible. L'index est ainsi
+# rangé par date : les correspondances les plus récentes se lisent à rebours, sans tri
+_KEY_ROWID_BITS = 36
+_KEY_ROWID_MASK = (1 << _KEY_ROWID_BITS) - 1
+_KEY_EPOCH = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+def _search_key(date_iso, rowid):
+    """Clé d'index d'un email : sa date (à la minute) puis son rowid, 0 pour une date illisible"""
+    try:
+        moment = datetime.fromisoformat(date_iso.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        minutes = 0
+    else:
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        minutes = max(0, int((moment - _KEY_EPOCH).total_seconds()) // 60)
+    return (minutes << _KEY_ROWID_BITS) | rowid
+
+
+def _fallback_id(summary):
+    """Identifiant stable d'un email sans id, calculé à partir de son expéditeur, son objet et sa date"""
+    key = '\n'.join((summary['de'], summary['objet'], summary['date']))
+    return 'sans-id:' + hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+# Poids des colonnes de l'index plein texte dans le classement (bm25)
+SEARCH_WEIGHTS = {'subject': 5.0, 'sender': 3.0, 'company': 5.0, 'body': 1.0}
+SEARCH_LIMIT = 20
+# Au-delà, seuls les emails correspondants les plus récents (date de l'email) sont
+# classés : la latence reste bornée quand un mot apparaît dans une grande partie de l'historique
+SEARCH_MAX_CANDIDATES = 2000
+
+_SINCE_RE = re.compile(r'\b(?:depuis|since):(\d{4}(?:-\d{2}(?:-\d{2})?)?)', re.IGNORECASE)
+
+
+def parse_search_query(text):
+    """Sépare une recherche en mots et date de début : « capgemini depuis:2026-03 »"""
+    match = _SINCE_RE.search(text)
+    since = match.group(1) if match else None
+    terms = _SINCE_RE.sub(' ', text).split()
+    return terms, since
+
+
+def _fts_query(terms):
+    """Requête FTS5 : tous les mots, chacun en préfixe (« capgem » trouve Capgemini)"""
+    return ' '.join('"' + term.replace('"', '') + '"*' for term in terms if term.replace('"', ''))
+
+
+class HistoryStore:
+    """Conserve chaque email classé une seule fois par (compte, id), et la liste
+    des emails de chaque exécution.
+
+    Réenregistrer un email déjà connu met sa ligne à jour : relancer une
+    exécution sur les mêmes emails ne crée pas de doublons.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+
+    def _connection(self):
+        """Ouvre la base au premier accès"""
+        if self._conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    started_at REAL NOT NULL,
+                    finished_at REAL,
+                    fetched INTEGER,
+                    promotional INTEGER
+                );
+                CREATE TABLE IF NOT EXISTS emails (
+                    account TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    sender TEXT,
+                    sender_domain TEXT,
+                    company TEXT,
+                    subject TEXT,
+                    date TEXT,
+                    date_iso TEXT,
+                    links TEXT,
+                    first_seen_run INTEGER NOT NULL,
+                    last_seen_run INTEGER NOT NULL,
+                    PRIMARY KEY (account, id)
+                );
+                CREATE TABLE IF NOT EXISTS run_emails (
+                    run_id INTEGER NOT NULL,
+                    account TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    num INTEGER NOT NULL,
+                    PRIMARY KEY (run_id, account, id)
+                );
+                CREATE INDEX IF NOT EXISTS idx_emails_id ON emails (id);
+                CREATE INDEX IF NOT EXISTS idx_emails_category ON emails (category);
+                CREATE INDEX IF NOT EXISTS idx_emails_sender_domain ON emails (sender_domain);
+                CREATE INDEX IF NOT EXISTS idx_emails_company ON emails (company);
+                CREATE INDEX IF NOT EXISTS idx_emails_date ON emails (date_iso);
+            """)
+
+            # Index plein texte, rangé par date (voir _search_key)
+            tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            if 'emails_search' not in tables:
+                conn.execute("""
+                    CREATE VIRTUAL TABLE emails_search USING fts5(
+                        subject, sender, company, body,
+                        tokenize = 'unicode61 remove_diacritics 2'
+                    )
+                """)
+                if 'emails_fts' in tables:
+                    # Index précédent, aligné sur emails.rowid : repris avec les corps déjà indexés
+                    rows = conn.execute("""
+                        SELECT e.date_iso, e.rowid, f.subject, f.sender, f.company, f.body
+                        FROM emails_fts f JOIN emails e ON e.rowid = f.rowid
+                    """).fetchall()
+                else:
+                    # Emails enregistrés avant l'index : indexés sans leur corps
+                    rows = conn.execute(
+                        "SELECT date_iso, rowid, subject, sender, COALESCE(company, ''), '' FROM emails"
+                    ).fetchall()
+                conn.executemany(
+                    "INSERT INTO emails_search (rowid, subject, sender, company, body) VALUES (?, ?, ?, ?, ?)",
+                    ((_search_key(date_iso, rowid), *fields) for date_iso, rowid, *fields in rows)
+                )
+                conn.execute("DROP TABLE IF EXISTS emails_fts")
+                conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def start_run(self):
+        """Crée une exécution et renvoie son identifiant"""
+        conn = self._connection()
+        cursor = conn.execute("INSERT INTO runs (started_at) VALUES (?)", (time.time(),))
+        conn.commit()
+        return cursor.lastrowid
+
+    def record(self, run_id, email, category, summary, body_text=''):
+        """Enregistre (ou met à jour) un email classé, l'indexe et le rattache à l'exécution.
+
+        `body_text` est le corps nettoyé, indexé pour la recherche plein texte.
+        """
+        account = email.get('account', '')
+        msg_id = email.get('id') or _fallback_id(summary)
+        date_iso = _iso_date(summary['date'])
+        conn = self._connection()
+        known = conn.execute(
+            "SELECT rowid, date_iso FROM emails WHERE account = ? AND id = ?", (account, msg_id)
+        ).fetchone()
+        if known:
+            conn.execute("DELETE FROM emails_search WHERE rowid = ?", (_search_key(known[1], known[0]),))
+
+        cursor = conn.execute(
+            """
+            INSERT INTO emails (account, id, category, sender, sender_domain, company, subject,
+                                date, date_iso, links, first_seen_run, last_seen_run)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (account, id) DO UPDATE SET
+                category = excluded.category,
+                sender = excluded.sender,
+                sender_domain = excluded.sender_domain,
+                company = excluded.company,
+                subject = excluded.subject,
+                date = excluded.date,
+                date_iso = excluded.date_iso,
+                links = excluded.links,
+                last_seen_run = excluded.last_seen_run
+            """,
+            (account, msg_id, category, summary['de'], email.sender_domain, summary.get('entreprise'),
+             summary['objet'], summary['date'], date_iso,
+             json.dumps(summary['liens'], ensure_ascii=False), run_id, run_id)
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO run_emails (run_id, account, id, num) VALUES (?, ?, ?, ?)",
+            (run_id, account, msg_id, summary['num'])
+        )
+
+        # La mise à jour garde le rowid de la ligne, l'insertion en crée un
+        rowid = known[0] if known else cursor.lastrowid
+        conn.execute(
+            "INSERT INTO emails_search (rowid, subject, sender, company, body) VALUES (?, ?, ?, ?, ?)",
+            (_search_key(date_iso, rowid), summary['objet'], summary['de'], summary.get('entreprise') or '',
+             body_text)
+        )
+
+    def finish_run(self, run_id, fetched, promotional):
+        """Termine une exécution et valide tous ses enregistrements"""
+        conn = self._connection()
+        conn.execute(
+            "UPDATE runs SET finished_at = ?, fetched = ?, promotional = ? WHERE run_id = ?",
+            (time.time(), fetched, promotional, run_id)
+        )
+        conn.commit()
+
+    def run_summaries(self, run_id):
+        """Résumés d'une exécution rangés par catégorie (format de job_tracker_data.json)"""
+        categorized = {category: [] for category in CATEGORIES}
+        rows = self._connection().execute(
+            """
+            SELECT e.account, e.category, e.sender, e.subject, e.date, e.links, e.company, r.num
+            FROM run_emails r JOIN emails e ON e.account = r.account AND e.id = r.id
+            WHERE r.run_id = ?
+            ORDER BY r.num
+            """,
+            (run_id,)
+        )
+        for account, category, sender, subject, date, links, company, num in rows:
+            summary = {
+                'compte': account,
+                'de': sender,
+                'objet': subject,
+                'date': date,
+                'liens': json.loads(links) if links else [],
+            }
+            if company:
+                summary['entreprise'] = company
+            summary['num'] = num
+            categorized.setdefault(category, []).append(summary)
+        return categorized
+
+    def search(self, terms, since=None, limit=SEARCH_LIMIT):
+        """Emails de l'historique contenant tous les mots, du plus pertinent au moins pertinent.
+
+        `since` (« AAAA », « AAAA-MM » ou « AAAA-MM-JJ ») exclut les emails plus anciens.
+        Renvoie (résultats, tronqué) : tronqué vaut True quand plus de
+        SEARCH_MAX_CANDIDATES emails correspondent et que seuls les plus récents ont été classés.
+        """
+        query = _fts_query(terms)
+        if not query:
+            return [], False
+        weights = ', '.join(str(weight) for weight in SEARCH_WEIGHTS.values())
+        conn = self._connection()
+
+        # La table emails n'est jointe avant le classement que pour filtrer par date
+        source = "emails_search f"
+        where = "emails_search MATCH ?"
+        params = [query]
+        if since:
+            source += f" JOIN emails e ON e.rowid = f.rowid & {_KEY_ROWID_MASK}"
+            where += " AND e.date_iso >= ?"
+            params.append(since)
+
+        # Clé du SEARCH_MAX_CANDIDATES-ième email correspondant, du plus récent au plus ancien,
+        # et celle du suivant s'il existe : l'index est lu à rebours dans l'ordre des dates
+        bounds = conn.execute(
+            f"SELECT f.rowid FROM {source} WHERE {where} ORDER BY f.rowid DESC LIMIT 2 OFFSET ?",
+            params + [SEARCH_MAX_CANDIDATES - 1]
+        ).fetchall()
+        truncated = len(bounds) == 2
+        if truncated:
+            where += " AND f.rowid >= ?"
+            params.append(bounds[0][0])
+
+        rows = conn.execute(
+            f"SELECT e.account, e.category, e.sender, e.subject, e.date, e.company "
+            f"FROM (SELECT f.rowid AS key, bm25(emails_search, {weights}) AS score FROM {source} "
+            f"      WHERE {where} ORDER BY score LIMIT ?) r "
+            f"JOIN emails e ON e.rowid = r.key & {_KEY_ROWID_MASK} ORDER BY r.score",
+            params + [limit]
+        )
+        results = [
+            {'compte': account, 'categorie': category, 'de': sender, 'objet': subject,
+             'date': date, 'entreprise': company}
+            for account, category, sender, subject, date, company in rows
+        ]
+        return results, truncated
+
+    def has_emails(self):
+        """Vérifie si l'historique contient au moins un email"""
+        return self._connection().execute("SELECT 1 FROM emails LIMIT 1").fetchone() is not None
+
+    def export_json(self, path, run_id):
+        """Écrit les résumés d'une exécution dans un fichier JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.run_summaries(run_id), f, ensure_ascii=False, indent=2)
+
+    def close(self):
+        """Ferme la connexion SQLite"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+_store = None
+
+
+def get_history_store():
+    """Historique partagé, ouvert au premier appel"""
+    global _store
+    if _store is None:
+        _store = HistoryStore(HISTORY_DB_FILE)
+    return _store
@@ -0,0 +1,96 @@
+"""
+Conversion HTML -> texte en une seule passe, arrêtée dès que le texte est assez long
+"""
+
+import re
+from html import unescape
+
+# Blocs dont le contenu n'est jamais affiché
+SKIPPED_TAGS = {'style', 'script', 'head'}
+
+# Texte inséré pour chaque balise (les autres balises deviennent un espace)
+START_TAG_TEXT = {
+    'br': '\n',
+    'li': '  • ',
+    'h1': '\n\n▶ ', 'h2': '\n\n▶ ', 'h3': '\n\n▶ ', 'h4': '\n\n▶ ', 'h5': '\n\n▶ ', 'h6': '\n\n▶ ',
+}
+END_TAG_TEXT = {
+    'p': '\n\n',
+    'div': '\n',
+    'tr': '\n',
+    'li': '\n',
+    'h1': '\n', 'h2': '\n', 'h3': '\n', 'h4': '\n', 'h5': '\n', 'h6': '\n',
+}
+
+# Un jeton : commentaire, balise (ouvrante ou fermante), déclaration
+# (<!DOCTYPE>, commentaire non fermé...) ou texte
+_TOKEN_RE = re.compile(r'<!--.*?-->|<(/?)([a-zA-Z][a-zA-Z0-9]*)[^>]*>|<[!?][^>]*>|[^<]+|<', re.DOTALL)
+_SKIP_END_RE = {tag: re.compile(rf'</{tag}\s*>', re.IGNORECASE) for tag in SKIPPED_TAGS}
+
+# Normalisation des espaces, appliquée au texte extrait
+WHITESPACE_RULES = [
+    (re.compile(r'\r\n?'), '\n'),
+    (re.compile(r'[ \t\xa0]+'), ' '),
+    (re.compile(r'\n '), '\n'),
+    (re.compile(r' \n'), '\n'),
+    (re.compile(r'\n{3,}'), '\n\n'),
+]
+
+
+def normalize_whitespace(text):
+    """Fusionne les espaces, supprime ceux de début et fin de ligne, limite les lignes vides"""
+    for pattern, repl in WHITESPACE_RULES:
+        text = pattern.sub(repl, text)
+    return text.strip()
+
+
+def _render(parts):
+    """Texte final à partir des morceaux extraits (entités décodées, espaces normalisés)"""
+    return normalize_whitespace(unescape(''.join(parts)))
+
+
+def html_to_text(html, max_chars):
+    """Convertit un corps HTML (ou texte) en texte lisible.
+
+    Le document est parcouru jeton par jeton ; les blocs style, script et head
+    sont sautés d'un coup. L'analyse s'arrête dès que `max_chars` caractères
+    de texte ont été produits : le reste du document n'est pas parcouru. Le
+    résultat peut donc dépasser `max_chars` et doit être tronqué par l'appelant.
+    """
+    parts = []
+    raw_length = 0
+    # Le texte brut contient plus d'espaces et d'entités que le texte final :
+    # sa longueur réelle n'est mesurée qu'au-delà de ce seuil
+    next_check = max_chars
+    pos = 0
+
+    while pos < len(html):
+        for token in _TOKEN_RE.finditer(html, pos):
+            tag = token.group(2)
+            if tag is None:
+                text = token.group()
+                if text.startswith('<!--') and text.endswith('-->'):
+                    continue
+                if text.startswith(('<!', '<?')):
+                    text = ' '
+            else:
+                tag = tag.lower()
+                closing = token.group(1)
+                if tag in SKIPPED_TAGS and not closing:
+                    end = _SKIP_END_RE[tag].search(html, token.end())
+                    pos = end.end() if end else len(html)
+                    break
+                text = (END_TAG_TEXT if closing else START_TAG_TEXT).get(tag, ' ')
+
+            parts.append(text)
+            raw_length += len(text)
+            if raw_length >= next_check:
+                length = len(_render(parts))
+                if length >= max_chars:
+                    return _render(parts)
+                # Seuil suivant au moins deux fois plus loin : coût total linéaire
+                next_check = max(raw_length + max_chars - length, raw_length * 2)
+        else:
+            break
+
+    return _render(parts)
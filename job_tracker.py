@@ -3,8 +3,12 @@ Job Tracker - Script principal
 Suivi automatique des emails liés à la recherche d'emploi
 """
 
+import time
+
+# Mesure du temps de démarrage (imports compris)
+_START_TIME = time.perf_counter()
+
 import sys
-import json
 
 # Encodage UTF-8 pour Windows
 if sys.platform == 'win32':
@@ -12,12 +16,16 @@ if sys.platform == 'win32':
     sys.stderr.reconfigure(encoding='utf-8', errors='replace')
 
 # Imports des modules
-from config import ACCOUNTS, CATEGORIES, get_date_info
-from gmail_handler import fetch_gmail_emails
-from outlook_handler import fetch_outlook_emails
-from filters import is_promotional_email, categorize_email, create_email_summary, clean_email_body, extract_links_from_email
+from config import CATEGORIES, HISTORY_DB_FILE, get_date_info
+from account_fetcher import fetch_all_accounts
+from detail_view import DetailIndex
+from filters import clean_email_body, get_classification_stats, save_company_cache
+from history_store import SEARCH_MAX_CANDIDATES, get_history_store, parse_search_query
+from pipeline import PipelineStats, release_body, run_pipeline
 from report import generate_html_report
 
+_IMPORT_TIME = time.perf_counter() - _START_TIME
+
 
 def display_date_info():
     """Affiche les informations sur la période d'analyse"""
@@ -29,79 +37,68 @@ def display_date_info():
         print("   ℹ️  Lundi détecté: retour au vendredi précédent")
 
 
-def display_email_detail(email):
-    """Affiche le détail complet d'un email"""
-    print("\n" + "=" * 80)
-    print("📧 DÉTAIL DE L'EMAIL")
-    print("=" * 80)
-    print(f"📌 Compte: [{email.get('account', 'Inconnu')}]")
-    print(f"📧 De: {email.get('sender', 'Inconnu')}")
-    print(f"📝 Objet: {email.get('subject', 'Sans objet')}")
-    print(f"📅 Date: {email.get('date', 'Inconnue')}")
-    print("-" * 80)
-    print("📄 CONTENU:")
-    print("-" * 80)
+def display_search_results(query):
+    """Recherche dans l'historique de tous les emails classés et affiche les résultats"""
+    terms, since = parse_search_query(query)
+    if not terms:
+        print("❌ Indiquez au moins un mot à rechercher (ex: search capgemini depuis:2026-03)")
+        return
 
-    body = email.get('body', '')
-    clean_body = clean_email_body(body)
-    print(clean_body)
+    results, truncated = get_history_store().search(terms, since)
+    if not results:
+        print("🔍 Aucun email trouvé dans l'historique")
+        return
 
-    # Afficher les liens
-    links = extract_links_from_email(body)
-    if links:
-        print("\n" + "-" * 80)
-        print("🔗 LIENS TROUVÉS:")
-        for i, link in enumerate(links[:10], 1):
-            print(f"  {i}. {link}")
-
-    print("=" * 80)
+    print(f"\n🔍 {len(results)} résultat(s), du plus pertinent au moins pertinent:")
+    print("-" * 70)
+    for i, result in enumerate(results, 1):
+        print(f"  {i}. [{result['compte']}] {result['categorie']}")
+        print(f"     📅 {result['date'][:16] if result['date'] else 'N/A'}")
+        print(f"     📧 De: {result['de']}")
+        print(f"     📝 Objet: {result['objet']}")
+    if truncated:
+        print(f"\nℹ️  Plus de {SEARCH_MAX_CANDIDATES} emails correspondent : seuls les plus récents ont été classés."
+              " Ajoutez un mot ou depuis:AAAA-MM pour affiner.")
 
 
 def main():
     print("=" * 80)
     print("🔍 JOB TRACKER - Suivi automatique de vos emails emploi")
     print("=" * 80)
+    print(f"⏱️  Démarrage: {_IMPORT_TIME * 1000:.0f} ms")
     
     # Afficher les informations de date
     display_date_info()
     print("-" * 80)
 
-    all_emails = []
-
-    # Récupérer les emails de tous les comptes
-    for account in ACCOUNTS:
-        if account['type'] == 'gmail':
-            emails = fetch_gmail_emails(account)
-        elif account['type'] == 'outlook':
-            emails = fetch_outlook_emails(account)
-        else:
-            print(f"   ⚠️ Type de compte non supporté: {account['type']}")
-            continue
-
-        all_emails.extend(emails)
-
-    print(f"\n📬 Total: {len(all_emails)} emails récupérés")
-
-    # Filtrer et catégoriser
+    # Récupérer, filtrer, catégoriser et résumer les emails au fil de l'eau :
+    # seuls les emails retenus sont conservés, sans leur corps s'il est en cache
     categorized = {cat: [] for cat in CATEGORIES.keys()}
-    ignored_count = 0
-    emails_index = []
-    global_num = 0
-
-    for email in all_emails:
-        if is_promotional_email(email):
-            ignored_count += 1
-            continue
-
-        category = categorize_email(email)
-        if category:
-            global_num += 1
-            summary = create_email_summary(email)
-            summary['num'] = global_num
-            categorized[category].append(summary)
-            emails_index.append((global_num, email, summary, category))
-
-    print(f"🚫 {ignored_count} emails promotionnels ignorés")
+    details = DetailIndex()
+    stats = PipelineStats()
+    history = get_history_store()
+    run_id = history.start_run()
+
+    for email, category, summary in run_pipeline(fetch_all_accounts(), stats):
+        summary['num'] = len(details) + 1
+        categorized[category].append(summary)
+        # Corps nettoyé une seule fois : indexé dans l'historique et repris par la vue détaillée
+        body = email.get('body', '')
+        body_text = clean_email_body(body)
+        history.record(run_id, email, category, summary, body_text if body else '')
+        details.add(summary['num'], release_body(email), category, body_text)
+    history.finish_run(run_id, stats.fetched, stats.promotional)
+    save_company_cache()
+
+    # Vues détaillées des catégories prioritaires préparées pendant la lecture du récapitulatif
+    details.start_prefetch()
+
+    print(f"\n📬 Total: {stats.fetched} emails récupérés")
+    print(f"🚫 {stats.promotional} emails promotionnels ignorés")
+    cache_stats = get_classification_stats()
+    if cache_stats and cache_stats[0] + cache_stats[1]:
+        hits, misses, hit_rate = cache_stats
+        print(f"🗃️  Cache de classification: {hits}/{hits + misses} emails ({hit_rate:.0%})")
 
     # Affichage console
     print("\n" + "=" * 80)
@@ -131,16 +128,18 @@ def main():
     # Générer le rapport HTML
     generate_html_report(categorized)
 
-    # Sauvegarder les données
-    with open('job_tracker_data.json', 'w', encoding='utf-8') as f:
-        json.dump(categorized, f, ensure_ascii=False, indent=2)
-    print("💾 Données sauvegardées dans job_tracker_data.json")
+    # Exporter les données de cette exécution depuis l'historique
+    history.export_json('job_tracker_data.json', run_id)
+    print(f"💾 Données sauvegardées dans job_tracker_data.json (historique: {HISTORY_DB_FILE})")
 
-    # Mode interactif
-    if emails_index:
+    # Mode interactif (la recherche reste possible sans email dans cette exécution)
+    if details or history.has_emails():
         print("\n" + "=" * 80)
         print("🔎 MODE DÉTAIL - Tapez le numéro d'un email pour voir son contenu")
+        print("   'search <mots> [depuis:AAAA-MM-JJ]' pour chercher dans l'historique")
         print("   (ou 'q' pour quitter)")
+        if not details:
+            print("   ℹ️  Aucun email dans cette exécution : seule la recherche est disponible")
         print("=" * 80)
 
         while True:
@@ -151,17 +150,20 @@ def main():
                     print("👋 Au revoir!")
                     break
 
+                command, _, query = user_input.partition(' ')
+                if command.lower() in ['search', 'recherche']:
+                    display_search_results(query)
+                    continue
+
                 try:
                     num = int(user_input)
-                    found = False
-                    for idx_num, email_full, summary, cat in emails_index:
-                        if idx_num == num:
-                            display_email_detail(email_full)
-                            found = True
-                            break
-
-                    if not found:
-                        print(f"❌ Email #{num} non trouvé. Numéros valides: 1 à {len(emails_index)}")
+                    detail = details.render(num)
+                    if not details:
+                        print("❌ Aucun email dans cette exécution")
+                    elif detail is None:
+                        print(f"❌ Email #{num} non trouvé. Numéros valides: 1 à {len(details)}")
+                    else:
+                        print(detail)
 
                 except ValueError:
                     print("❌ Veuillez entrer un numéro valide ou 'q' pour quitter.")
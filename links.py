@@ -0,0 +1,142 @@
+"""
+Extraction des liens vers des offres d'emploi en une passe (trie de domaines inversés)
+"""
+
+import re
+from urllib.parse import urlsplit, urlunsplit
+
+# Pas de quantificateurs imbriqués : la recherche reste linéaire
+URL_RE = re.compile(r'https?://[^\s<>"\']+')
+# Hôte (sans identifiants ni port) et chemin d'un lien trouvé par URL_RE,
+# lus sans urlsplit pour écarter à moindre coût les liens hors offres
+_HOST_PATH_RE = re.compile(r'https?://(?:[^/?#@]*@)?([^/?#:]*)[^/?#]*([^?#]*)')
+
+# Paramètres de suivi supprimés avant la déduplication
+TRACKING_PARAM_PREFIXES = ('utm_',)
+TRACKING_PARAMS = {'trk', 'refid'}
+
+# Chemins qui désignent une offre, quel que soit le domaine
+JOB_PATH_MARKERS = ('/job', '/career', '/emploi')
+_JOB_MARKER_RE = re.compile('|'.join(map(re.escape, JOB_PATH_MARKERS)), re.IGNORECASE)
+
+# Ponctuation finale qui appartient à la phrase plutôt qu'au lien
+TRAILING_PUNCTUATION = ')].,;:!?'
+
+# Clé des nœuds du trie qui terminent un domaine connu
+_END = None
+
+
+def _strip_trailing(url):
+    """Retire la ponctuation finale, sauf une ')' qui ferme une '(' du lien"""
+    while url and url[-1] in TRAILING_PUNCTUATION:
+        if url[-1] == ')' and url.count('(') >= url.count(')'):
+            break
+        url = url[:-1]
+    return url
+
+
+def _is_tracking_param(param):
+    key = param.split('=', 1)[0].lower()
+    return key in TRACKING_PARAMS or key.startswith(TRACKING_PARAM_PREFIXES)
+
+
+def canonicalize_url(url, parts=None):
+    """Forme canonique d'un lien : schéma et hôte en minuscules, sans paramètres de suivi.
+
+    `parts` est le résultat de urlsplit(url) s'il est déjà connu.
+    """
+    if parts is None:
+        parts = urlsplit(url.replace('&amp;', '&'))
+    query = '&'.join(param for param in parts.query.split('&') if param and not _is_tracking_param(param))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, query, parts.fragment))
+
+
+def _has_job_marker(url):
+    """Vérifie si un lien contient un chemin d'offre (« /job », « /emploi »...)"""
+    return _JOB_MARKER_RE.search(url) is not None
+
+
+class LinkExtractor:
+    """Extrait les liens d'offres d'emploi d'un corps d'email.
+
+    Les domaines d'emploi (« indeed.com », « linkedin.com/jobs ») sont rangés
+    dans un trie de libellés inversés (com -> indeed) : un hôte est reconnu,
+    sous-domaines compris, en autant d'étapes qu'il a de libellés.
+    """
+
+    def __init__(self, job_domains, max_links):
+        self.max_links = max_links
+        self._trie = {}
+        domains = sorted({entry.lower().partition('/')[0] for entry in job_domains})
+        # Pré-filtre en C : la plupart des liens (marketing) n'ont aucun domaine d'emploi
+        self._host_re = re.compile(r'(?:^|\.)(?:' + '|'.join(map(re.escape, domains)) + r')$')
+        for entry in job_domains:
+            domain, _, path = entry.lower().partition('/')
+            node = self._trie
+            for label in reversed(domain.split('.')):
+                node = node.setdefault(label, {})
+            node.setdefault(_END, []).append('/' + path if path else '')
+
+    def is_job_host(self, host, path):
+        """Vérifie si un hôte (et son chemin) appartient à un domaine d'emploi"""
+        if self._host_re.search(host) is None:
+            return False
+        node = self._trie
+        for label in reversed(host.split('.')):
+            node = node.get(label)
+            if node is None:
+                return False
+            prefixes = node.get(_END)
+            if prefixes and any(path.startswith(prefix) for prefix in prefixes):
+                return True
+        return False
+
+    def _host_and_path(self, url):
+        """Hôte et chemin (en minuscules) d'un lien"""
+        match = _HOST_PATH_RE.match(url)
+        if match is None:
+            return '', ''
+        return match.group(1).lower().rstrip('.'), match.group(2).lower()
+
+    def is_job_link(self, url):
+        """Vérifie si un lien (canonique) mène à une offre d'emploi"""
+        return self.is_job_host(*self._host_and_path(url)) or _has_job_marker(url)
+
+    def extract(self, body):
+        """Liens d'offres d'emploi du corps, dans l'ordre d'apparition et sans doublons.
+
+        L'hôte, le chemin et les marqueurs sont vérifiés avant tout : seuls les
+        liens d'offres sont découpés par urlsplit (une fois), mis sous forme
+        canonique et dédupliqués. Le parcours s'arrête dès que `max_links`
+        liens ont été trouvés.
+        """
+        links = []
+        seen = set()
+        host_path_match = _HOST_PATH_RE.match
+        marker_search = _JOB_MARKER_RE.search
+        for match in URL_RE.finditer(body):
+            raw = match.group()
+            if raw[-1] in TRAILING_PUNCTUATION:
+                raw = _strip_trailing(raw)
+            raw = raw.replace('&amp;', '&')
+            parts = host_path_match(raw)
+            by_host = parts is not None and self.is_job_host(
+                parts.group(1).lower().rstrip('.'), parts.group(2).lower()
+            )
+            if not by_host and marker_search(raw) is None:
+                continue
+
+            try:
+                url = canonicalize_url(raw, urlsplit(raw))
+            except ValueError:
+                continue
+            # Un marqueur présent seulement dans un paramètre de suivi ne compte pas
+            if not by_host and not _has_job_marker(url):
+                continue
+            if url in seen:
+                continue
+            seen.add(url)
+            links.append(url)
+            if len(links) >= self.max_links:
+                break
+        return links
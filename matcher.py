@@ -0,0 +1,87 @@
+"""
+Recherche multi-mots-clés en une seule passe (automate d'Aho-Corasick)
+"""
+
+from collections import deque
+
+# En dessous de ce nombre de mots-clés, une recherche `in` par mot-clé (en C)
+# reste plus rapide que le parcours de l'automate en Python
+MIN_AUTOMATON_KEYWORDS = 256
+
+
+class KeywordMatcher:
+    """Compile une liste de mots-clés en un automate d'Aho-Corasick.
+
+    La recherche parcourt le texte une seule fois, quel que soit le nombre de
+    mots-clés. Les mots-clés sont comparés en minuscules : le texte passé aux
+    méthodes de recherche doit déjà être en minuscules.
+    """
+
+    def __init__(self, keywords, min_automaton_keywords=MIN_AUTOMATON_KEYWORDS):
+        self.keywords = [keyword.lower() for keyword in keywords]
+        self.use_automaton = len(self.keywords) >= min_automaton_keywords
+        # Transitions, lien d'échec et sorties (indices des mots-clés) par nœud
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        # Un mot-clé vide est présent dans tous les textes
+        self._always = frozenset(i for i, keyword in enumerate(self.keywords) if not keyword)
+
+        for index, keyword in enumerate(self.keywords):
+            if keyword:
+                self._add(keyword, index)
+        self._build_fail_links()
+
+    def _add(self, keyword, index):
+        """Ajoute un mot-clé au trie"""
+        node = 0
+        for char in keyword:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            node = next_node
+        self._output[node] += (index,)
+
+    def _build_fail_links(self):
+        """Calcule les liens d'échec (parcours en largeur) et fusionne les sorties"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] += self._output[self._fail[child]]
+
+    def _iter_outputs(self, text):
+        """Parcourt le texte et renvoie les sorties non vides rencontrées"""
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                yield output[node]
+
+    def find_all(self, text):
+        """Ensemble des indices des mots-clés présents dans le texte"""
+        if not self.use_automaton:
+            return {i for i, keyword in enumerate(self.keywords) if keyword in text}
+
+        found = set(self._always)
+        for indices in self._iter_outputs(text):
+            found.update(indices)
+        return found
+
+    def find_first(self, text):
+        """Plus petit indice (ordre de la liste) des mots-clés présents, ou None"""
+        if not self.use_automaton:
+            return next((i for i, keyword in enumerate(self.keywords) if keyword in text), None)
+        return min(self.find_all(text), default=None)
@@ -0,0 +1,161 @@
+"""
+Cache local des emails déjà téléchargés (SQLite)
+"""
+
+import sqlite3
+import threading
+import time
+
+from config import (
+    MESSAGE_CACHE_ENABLED, MESSAGE_CACHE_FILE, MESSAGE_CACHE_MAX_AGE_DAYS, MESSAGE_CACHE_MAX_MB
+)
+
+# Champs décodés conservés pour les filtres et l'affichage
+FIELDS = ('subject', 'sender', 'date', 'body')
+
+# Limite du nombre de paramètres d'une requête SQLite
+_CHUNK = 500
+
+
+class MessageCache:
+    """Stocke les emails par (compte, id) pour ne jamais les télécharger deux fois"""
+
+    def __init__(self, path, max_age_days=MESSAGE_CACHE_MAX_AGE_DAYS, max_mb=MESSAGE_CACHE_MAX_MB):
+        self.path = path
+        self.max_age_days = max_age_days
+        self.max_bytes = max_mb * 1024 * 1024
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self):
+        """Ouvre la base au premier accès (appelé sous self._lock)"""
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS messages (
+                    account TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    subject TEXT,
+                    sender TEXT,
+                    date TEXT,
+                    body TEXT,
+                    size INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (account, id)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_accessed ON messages (accessed_at)")
+            self._conn = conn
+            self._evict()
+        return self._conn
+
+    def get_many(self, account, msg_ids):
+        """Renvoie {id: email} pour les emails de `msg_ids` présents dans le cache"""
+        found = {}
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            for i in range(0, len(msg_ids), _CHUNK):
+                chunk = list(msg_ids[i:i + _CHUNK])
+                placeholders = ','.join('?' * len(chunk))
+                rows = conn.execute(
+                    f"SELECT id, subject, sender, date, body FROM messages "
+                    f"WHERE account = ? AND id IN ({placeholders})",
+                    [account] + chunk
+                ).fetchall()
+                for msg_id, subject, sender, date, body in rows:
+                    found[msg_id] = {
+                        'subject': subject, 'sender': sender, 'date': date, 'body': body, 'id': msg_id
+                    }
+            if found:
+                conn.executemany(
+                    "UPDATE messages SET accessed_at = ? WHERE account = ? AND id = ?",
+                    [(now, account, msg_id) for msg_id in found]
+                )
+                conn.commit()
+        return found
+
+    def get(self, account, msg_id):
+        """Renvoie un email du cache, ou None"""
+        return self.get_many(account, [msg_id]).get(msg_id)
+
+    def contains(self, account, msg_id):
+        """Vérifie si un email est présent dans le cache"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT 1 FROM messages WHERE account = ? AND id = ?", (account, msg_id)
+            ).fetchone()
+        return row is not None
+
+    def put_many(self, account, emails):
+        """Enregistre (ou remplace) des emails dans le cache.
+
+        Les emails au corps tronqué (raw_body) ne sont pas enregistrés : relus
+        depuis le cache, ils n'afficheraient que le début de leur corps.
+        """
+        now = time.time()
+        rows = []
+        for email in emails:
+            if email.get('raw_body'):
+                continue
+            values = [email.get(field) or '' for field in FIELDS]
+            size = sum(len(value.encode('utf-8')) for value in values)
+            rows.append((account, email['id'], *values, size, now, now))
+        if not rows:
+            return
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO messages "
+                "(account, id, subject, sender, date, body, size, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.commit()
+
+    def put(self, account, email):
+        """Enregistre un email dans le cache"""
+        self.put_many(account, [email])
+
+    def _evict(self):
+        """Supprime les emails trop anciens, puis les moins récemment lus au-delà de la taille max"""
+        conn = self._conn
+        cutoff = time.time() - self.max_age_days * 86400
+        conn.execute("DELETE FROM messages WHERE fetched_at < ?", (cutoff,))
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM messages").fetchone()[0]
+        if total > self.max_bytes:
+            excess = total - self.max_bytes
+            to_delete = []
+            for account, msg_id, size in conn.execute(
+                "SELECT account, id, size FROM messages ORDER BY accessed_at"
+            ):
+                to_delete.append((account, msg_id))
+                excess -= size
+                if excess <= 0:
+                    break
+            conn.executemany("DELETE FROM messages WHERE account = ? AND id = ?", to_delete)
+        conn.commit()
+
+    def close(self):
+        """Ferme la connexion SQLite"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_message_cache():
+    """Cache partagé par tous les comptes (None si désactivé dans la config)"""
+    global _cache
+    if not MESSAGE_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = MessageCache(MESSAGE_CACHE_FILE)
+    return _cache
@@ -3,14 +3,76 @@ Gestion des emails Outlook
 """
 
 import os
-import msal
-import requests
+import json
+import threading
+import time
 
-from config import OUTLOOK_SCOPES, START_DATE_OUTLOOK
+# msal et requests sont importés à la demande : ils ne sont chargés que si
+# un compte Outlook est configuré
+
+from config import (
+    OUTLOOK_SCOPES, START_DATE_OUTLOOK, OUTLOOK_DELTA_SYNC, OUTLOOK_PAGE_SIZE,
+    HTTP_TIMEOUT, HTTP_RETRIES, TWO_PHASE_FETCH, GRAPH_REQUESTS_PER_SEC
+)
+from filters import is_promotional_header
+from message_cache import get_message_cache
+from rate_limiter import RETRYABLE_STATUSES, get_scheduler, parse_retry_after
+
+GRAPH_URL = "https://graph.microsoft.com/v1.0"
+# Seuls les champs utilisés par les filtres sont transférés
+LIST_FIELDS = "id,subject,from,receivedDateTime"
+MESSAGE_FIELDS = LIST_FIELDS + ",body"
+# Nombre maximal de requêtes par appel $batch de Graph
+GRAPH_BATCH_SIZE = 20
+
+_session = None
+# Tokens d'accès du processus, indexés par token_file : (token, expiration)
+_tokens = {}
+_tokens_lock = threading.Lock()
+
+
+def get_http_session():
+    """Session HTTP partagée (keep-alive, nouvelles tentatives sur erreur réseau).
+
+    Les réponses 429 / 5xx sont gérées par _graph_request, qui respecte le
+    quota du compte et l'en-tête Retry-After.
+    """
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retries = Retry(
+            total=HTTP_RETRIES,
+            backoff_factor=1,
+            status=0,
+            allowed_methods=frozenset(['GET', 'POST'])
+        )
+        session = requests.Session()
+        session.mount('https://', HTTPAdapter(max_retries=retries))
+        _session = session
+    return _session
 
 
 def get_outlook_token(token_file):
-    """Obtient un token d'accès pour Microsoft Graph API"""
+    """Obtient un token d'accès pour Microsoft Graph API (réutilisé tant qu'il est valide)"""
+    with _tokens_lock:
+        token, expires_at = _tokens.get(token_file, (None, 0))
+        if token and time.time() < expires_at:
+            return token
+
+        token, expires_in = _acquire_outlook_token(token_file)
+        if token:
+            # Marge d'une minute avant l'expiration réelle
+            _tokens[token_file] = (token, time.time() + expires_in - 60)
+        return token
+
+
+def _acquire_outlook_token(token_file):
+    """Authentification MSAL : cache de tokens sur disque, sinon device flow"""
+    import msal
+
     CLIENT_ID = "VOTRE_CLIENT_ID"  # Depuis Azure Portal
     TENANT_ID = "common"
 
@@ -40,11 +102,166 @@ def get_outlook_token(token_file):
         with open(token_file, 'w') as f:
             f.write(cache.serialize())
 
-    return result.get('access_token')
+    return result.get('access_token'), int(result.get('expires_in', 0))
+
+
+def _graph_request(session, scheduler, method, url, units=1, **kwargs):
+    """Appel à Microsoft Graph limité en débit ; 429 / 5xx sont retentés avec backoff.
+
+    `units` est le nombre de requêtes Graph représentées (sous-requêtes d'un $batch).
+    """
+    attempt = 0
+    while True:
+        scheduler.acquire(units)
+        response = session.request(method, url, timeout=HTTP_TIMEOUT, **kwargs)
+        if response.status_code not in RETRYABLE_STATUSES or attempt >= scheduler.max_retries:
+            return response
+        scheduler.wait_before_retry(attempt, parse_retry_after(response.headers.get('Retry-After')))
+        attempt += 1
+
+
+def _delta_file(token_file):
+    """Chemin du deltaLink sauvegardé pour un token_file"""
+    return os.path.splitext(token_file)[0] + '_delta.json'
+
+
+def _load_delta_link(token_file):
+    """Lit le dernier deltaLink de ce compte (None si absent)"""
+    delta_file = _delta_file(token_file)
+    if not os.path.exists(delta_file):
+        return None
+    try:
+        with open(delta_file, 'r', encoding='utf-8') as f:
+            return json.load(f).get('deltaLink')
+    except (OSError, ValueError):
+        return None
+
+
+def _save_delta_link(token_file, delta_link):
+    """Sauvegarde le deltaLink renvoyé par la dernière page d'une synchronisation"""
+    with open(_delta_file(token_file), 'w', encoding='utf-8') as f:
+        json.dump({'deltaLink': delta_link}, f)
+
+
+def _parse_outlook_message(msg, account_name):
+    """Convertit un message Graph au format commun des emails"""
+    return {
+        'subject': msg.get('subject') or '',
+        'sender': (msg.get('from') or {}).get('emailAddress', {}).get('address', 'Inconnu'),
+        'date': msg.get('receivedDateTime', ''),
+        'body': (msg.get('body') or {}).get('content', ''),
+        'id': msg.get('id', ''),
+        'account': account_name,
+        'email_address': 'Outlook'
+    }
+
+
+def _fetch_outlook_bodies(session, scheduler, token, msg_ids):
+    """Récupère le corps de plusieurs messages via l'API $batch de Graph.
+
+    Seules les sous-requêtes limitées (429) ou en erreur serveur sont renvoyées
+    dans un nouveau $batch. Renvoie {id: contenu} ; un message en échec
+    définitif est simplement absent du résultat.
+    """
+    headers = {'Authorization': f'Bearer {token}', 'Content-Type': 'application/json'}
+    bodies = {}
+
+    for i in range(0, len(msg_ids), GRAPH_BATCH_SIZE):
+        pending = msg_ids[i:i + GRAPH_BATCH_SIZE]
+        attempt = 0
+
+        while pending:
+            payload = {'requests': [
+                {'id': str(n), 'method': 'GET', 'url': f"/me/messages/{msg_id}?$select=body"}
+                for n, msg_id in enumerate(pending)
+            ]}
+            try:
+                response = _graph_request(
+                    session, scheduler, 'POST', f"{GRAPH_URL}/$batch",
+                    headers=headers, json=payload, units=len(pending)
+                )
+                response.raise_for_status()
+            except Exception as e:
+                print(f"   ⚠️ Échec du batch Outlook ({len(pending)} emails): {e}")
+                break
+
+            retry = []
+            retry_after = []
+            for item in response.json().get('responses', []):
+                msg_id = pending[int(item['id'])]
+                status = item.get('status')
+                if status == 200:
+                    bodies[msg_id] = (item.get('body') or {}).get('body', {}).get('content', '')
+                elif status in RETRYABLE_STATUSES:
+                    retry.append(msg_id)
+                    delay = parse_retry_after((item.get('headers') or {}).get('Retry-After'))
+                    if delay is not None:
+                        retry_after.append(delay)
+                else:
+                    print(f"   ⚠️ Email {msg_id} ignoré: HTTP {status}")
+
+            if retry and attempt >= scheduler.max_retries:
+                print(f"   ⚠️ {len(retry)} emails ignorés après {attempt + 1} tentatives")
+                break
+            if retry:
+                scheduler.wait_before_retry(attempt, max(retry_after) if retry_after else None)
+                attempt += 1
+            pending = retry
+
+    return bodies
+
+
+def _complete_outlook_page(session, scheduler, token, messages, account_name, cache):
+    """Complète une page de messages listés sans corps.
+
+    Les corps viennent du cache, ou sont récupérés via $batch. Avec
+    TWO_PHASE_FETCH, les emails rejetés par le pré-filtre sont renvoyés sans corps.
+    """
+    msg_ids = [msg['id'] for msg in messages]
+    cached = cache.get_many(account_name, msg_ids) if cache else {}
+
+    rejected = {}
+    missing = []
+    for msg in messages:
+        if msg['id'] in cached:
+            continue
+        headers_only = _parse_outlook_message(msg, account_name)
+        if TWO_PHASE_FETCH and is_promotional_header(headers_only):
+            rejected[msg['id']] = headers_only
+        else:
+            missing.append(msg)
+
+    bodies = _fetch_outlook_bodies(session, scheduler, token, [msg['id'] for msg in missing])
+    fetched = {}
+    for msg in missing:
+        if msg['id'] in bodies:
+            msg['body'] = {'content': bodies[msg['id']]}
+            fetched[msg['id']] = _parse_outlook_message(msg, account_name)
+    if cache:
+        cache.put_many(account_name, fetched.values())
+
+    for msg_id in msg_ids:
+        email = cached.get(msg_id)
+        if email:
+            email['account'] = account_name
+            email['email_address'] = 'Outlook'
+        else:
+            email = fetched.get(msg_id) or rejected.get(msg_id)
+        if email:
+            yield email
+
+
+def _cache_outlook_page(messages, account_name, cache):
+    """Emails d'une page listée avec les corps ; ceux absents du cache y sont ajoutés"""
+    emails = [_parse_outlook_message(msg, account_name) for msg in messages]
+    if cache and emails:
+        known = cache.get_many(account_name, [email['id'] for email in emails])
+        cache.put_many(account_name, [email for email in emails if email['id'] not in known])
+    return emails
 
 
 def fetch_outlook_emails(account):
-    """Récupère les emails d'un compte Outlook"""
+    """Récupère les emails d'un compte Outlook (générateur, page par page)"""
     token_file = account["token_file"]
     account_name = account["name"]
 
@@ -54,29 +271,64 @@ def fetch_outlook_emails(account):
         token = get_outlook_token(token_file)
         if not token:
             print(f"   ❌ Impossible d'obtenir le token Outlook")
-            return []
+            return
+
+        print(f"   ✅ Connecté à Outlook")
+
+        session = get_http_session()
+        scheduler = get_scheduler(f"graph:{token_file}", GRAPH_REQUESTS_PER_SEC)
+        cache = get_message_cache()
+        # Le listing transfère les corps (une requête pour OUTLOOK_PAGE_SIZE emails).
+        # Avec TWO_PHASE_FETCH seulement, il ne transfère que les en-têtes : les
+        # messages absents du cache et non rejetés sont complétés via $batch,
+        # au prix d'une unité de quota Graph par message
+        headers_first = TWO_PHASE_FETCH
+        fields = LIST_FIELDS if headers_first else MESSAGE_FIELDS
+        headers = {
+            'Authorization': f'Bearer {token}',
+            'Prefer': f'odata.maxpagesize={OUTLOOK_PAGE_SIZE}'
+        }
+        date_filter = f"receivedDateTime ge {START_DATE_OUTLOOK}"
+
+        if OUTLOOK_DELTA_SYNC:
+            # Le delta n'existe que par dossier : on suit la boîte de réception
+            initial_url = f"{GRAPH_URL}/me/mailFolders/inbox/messages/delta?$select={fields}&$filter={date_filter}"
+            url = _load_delta_link(token_file) or initial_url
+            if url != initial_url:
+                print(f"   🔁 Synchronisation delta depuis la dernière exécution")
+        else:
+            url = f"{GRAPH_URL}/me/messages?$select={fields}&$filter={date_filter}&$top={OUTLOOK_PAGE_SIZE}"
+
+        count = 0
+        delta_link = None
+        while url:
+            response = _graph_request(session, scheduler, 'GET', url, headers=headers)
+            if response.status_code == 410 and OUTLOOK_DELTA_SYNC and count == 0 and url != initial_url:
+                print("   ℹ️  deltaLink expiré: resynchronisation complète")
+                url = initial_url
+                continue
+            response.raise_for_status()
+            data = response.json()
+
+            # Le delta signale aussi les messages supprimés
+            messages = [msg for msg in data.get('value', []) if '@removed' not in msg]
+            if headers_first:
+                emails = _complete_outlook_page(session, scheduler, token, messages, account_name, cache)
+            else:
+                emails = _cache_outlook_page(messages, account_name, cache)
 
-        headers = {'Authorization': f'Bearer {token}'}
-        url = f"https://graph.microsoft.com/v1.0/me/messages?$filter=receivedDateTime ge {START_DATE_OUTLOOK}&$top=200"
+            for email in emails:
+                count += 1
+                yield email
 
-        response = requests.get(url, headers=headers)
-        data = response.json()
+            # Page suivante (absente sur la dernière page)
+            url = data.get('@odata.nextLink')
+            delta_link = data.get('@odata.deltaLink', delta_link)
 
-        emails = []
-        for msg in data.get('value', []):
-            emails.append({
-                'subject': msg.get('subject', ''),
-                'sender': msg.get('from', {}).get('emailAddress', {}).get('address', 'Inconnu'),
-                'date': msg.get('receivedDateTime', ''),
-                'body': msg.get('body', {}).get('content', ''),
-                'id': msg.get('id', ''),
-                'account': account_name,
-                'email_address': 'Outlook'
-            })
+        print(f"   📥 [{account_name}] {count} emails récupérés")
 
-        print(f"   ✅ Connecté à Outlook - {len(emails)} emails trouvés")
-        return emails
+        if OUTLOOK_DELTA_SYNC and delta_link:
+            _save_delta_link(token_file, delta_link)
 
     except Exception as e:
         print(f"   ❌ Erreur Outlook [{account_name}]: {e}")
-        return []
@@ -0,0 +1,75 @@
+"""
+Traitement des emails en flux : récupération -> classification (anti-promo, catégorie, résumé) -> collecte
+
+Chaque étape est un générateur : un email n'est conservé que tant qu'une étape
+en a besoin. La récupération tourne dans ses propres threads, derrière des
+files bornées (account_fetcher), et avance pendant la classification.
+"""
+
+from filters import EmailRecord, classify_stream
+from gmail_handler import get_full_body
+from message_cache import get_message_cache
+
+
+class PipelineStats:
+    """Compteurs de la chaîne de traitement"""
+
+    def __init__(self):
+        self.fetched = 0
+        self.promotional = 0
+        self.uncategorized = 0
+        self.kept = 0
+
+
+def read_emails(emails, stats):
+    """Étape d'entrée : compte les emails récupérés et les passe sous forme d'EmailRecord"""
+    for email in emails:
+        stats.fetched += 1
+        yield EmailRecord(email)
+
+
+def categorize(records, stats):
+    """Étape anti-promo, catégorisation et résumé : génère (email, catégorie, résumé) des emails retenus.
+
+    Passe par classify_stream : cache des classifications, et répartition sur
+    plusieurs processus pour les gros volumes. Un email écarté (promotionnel
+    ou sans catégorie) est abandonné, et son corps libéré, dès son résultat connu.
+    """
+    for record, (promotional, category, summary) in classify_stream(records):
+        if promotional:
+            stats.promotional += 1
+            record.data = {}
+        elif category is None:
+            stats.uncategorized += 1
+            record.data = {}
+        else:
+            stats.kept += 1
+            yield record, category, summary
+
+
+def run_pipeline(emails, stats):
+    """Enchaîne les étapes sur un flux d'emails (ex. fetch_all_accounts())"""
+    return categorize(read_emails(emails, stats), stats)
+
+
+def release_body(record):
+    """Libère le corps d'un email conservé pour la vue détaillée, s'il peut être relu dans le cache local.
+
+    Les corps tronqués (raw_body) restent en mémoire : ils ne sont pas mis en cache.
+    """
+    cache = get_message_cache()
+    data = record.data
+    if cache is None or data.get('raw_body') or not data.get('id') or 'body' not in data:
+        return record
+    if cache.contains(data.get('account', ''), data['id']):
+        record.data = {key: value for key, value in data.items() if key != 'body'}
+    return record
+
+
+def load_body(email):
+    """Corps complet d'un email, relu dans le cache local s'il a été libéré"""
+    if 'body' in email.data:
+        return get_full_body(email)
+    cache = get_message_cache()
+    cached = cache.get(email.get('account', ''), email['id']) if cache else None
+    return cached['body'] if cached else ''
@@ -0,0 +1,112 @@
+"""
+Planification des requêtes API : quotas, limitation de débit et nouvelles tentatives
+"""
+
+import random
+import threading
+import time
+
+from config import API_MAX_RETRIES, API_BACKOFF_BASE, API_BACKOFF_MAX
+
+# Codes HTTP pour lesquels une nouvelle tentative a du sens
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RequestScheduler:
+    """Limiteur de débit (token bucket) partagé par les requêtes d'un même quota.
+
+    `rate` unités sont rendues par seconde, dans la limite de `capacity`.
+    Une requête consomme le coût qui lui est associé (unités de quota Gmail,
+    ou 1 par appel Graph). Un serveur qui demande d'attendre (Retry-After)
+    met en pause toutes les requêtes du même quota.
+    """
+
+    def __init__(self, rate, capacity=None, max_retries=API_MAX_RETRIES,
+                 backoff_base=API_BACKOFF_BASE, backoff_max=API_BACKOFF_MAX):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, units=1):
+        """Attend que `units` unités de quota soient disponibles, puis les consomme"""
+        # Une requête plus coûteuse que la capacité attend simplement un seau plein
+        units = min(float(units), self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self._tokens >= units:
+                        self._tokens -= units
+                        return
+                    wait = (units - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Suspend toutes les requêtes de ce quota pendant `seconds` secondes"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def backoff_delay(self, attempt, retry_after=None):
+        """Délai avant la tentative `attempt` : exponentiel avec jitter, ou Retry-After"""
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def wait_before_retry(self, attempt, retry_after=None):
+        """Attend avant une nouvelle tentative (Retry-After suspend tout le quota)"""
+        delay = self.backoff_delay(attempt, retry_after)
+        if retry_after is not None:
+            self.pause(delay)
+        time.sleep(delay)
+
+    def call(self, func, units=1, classify_error=None):
+        """Exécute `func()` en respectant le quota, avec nouvelles tentatives.
+
+        `classify_error(exc)` renvoie (réessayable, retry_after) pour une
+        exception levée par `func` ; les erreurs non réessayables sont relancées.
+        """
+        attempt = 0
+        while True:
+            self.acquire(units)
+            try:
+                return func()
+            except Exception as e:
+                retryable, retry_after = classify_error(e) if classify_error else (False, None)
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                self.wait_before_retry(attempt, retry_after)
+                attempt += 1
+
+
+def parse_retry_after(value):
+    """Convertit un en-tête Retry-After (en secondes) en float, ou None"""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(key, rate, capacity=None):
+    """Planificateur partagé par tous les appels d'un même quota (ex: un compte)"""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(key)
+        if scheduler is None:
+            scheduler = RequestScheduler(rate, capacity)
+            _schedulers[key] = scheduler
+    return scheduler
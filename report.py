@@ -1,14 +1,21 @@
 """
 Génération du rapport HTML
+
+Le rapport est écrit au fil de l'eau dans le fichier (aucune page complète en
+mémoire), catégorie par catégorie. Tous les champs des
+emails sont échappés. Au-delà de REPORT_PAGE_SIZE emails, une catégorie est
+découpée en pages repliées que le navigateur ne met en page qu'à l'ouverture.
 """
 
 from datetime import datetime
+from html import escape
 
+from config import REPORT_PAGE_SIZE
 
-def generate_html_report(categorized_emails, output_file="rapport_emploi.html"):
-    """Génère un rapport HTML avec liens cliquables"""
+# Taille du tampon d'écriture du fichier
+WRITE_BUFFER = 1 << 16
 
-    html = """<!DOCTYPE html>
+_HEADER = """<!DOCTYPE html>
 <html lang="fr">
 <head>
     <meta charset="UTF-8">
@@ -54,7 +61,9 @@ def generate_html_report(categorized_emails, output_file="rapport_emploi.html"):
             display: flex; 
             justify-content: space-between; 
             align-items: center; 
+            list-style: none; 
         }
+        .category-header::-webkit-details-marker { display: none; }
         .category-header:hover { background: #1a4a7a; }
         .category-header h2 { font-size: 1.2em; }
         .category-header .count { 
@@ -72,6 +81,8 @@ def generate_html_report(categorized_emails, output_file="rapport_emploi.html"):
             padding: 15px; 
             border-radius: 8px; 
             border-left: 4px solid #00d4ff; 
+            content-visibility: auto; 
+            contain-intrinsic-size: auto 120px; 
         }
         .email-item.accepted { border-left-color: #00ff88; }
         .email-item.refused { border-left-color: #ff4757; }
@@ -108,6 +119,13 @@ def generate_html_report(categorized_emails, output_file="rapport_emploi.html"):
         }
         .email-links a:hover { background: #00a8cc; }
         
+        .page { margin-top: 15px; }
+        .page > summary { 
+            cursor: pointer; 
+            color: #00d4ff; 
+            padding: 8px 0; 
+        }
+        
         .no-emails { color: #666; padding: 20px; text-align: center; }
         .generated { text-align: center; margin-top: 30px; color: #666; font-size: 0.9em; }
     </style>
@@ -118,78 +136,115 @@ def generate_html_report(categorized_emails, output_file="rapport_emploi.html"):
     <div class="stats">
 """
 
-    # Statistiques
-    total = sum(len(emails) for emails in categorized_emails.values())
-    html += f'<div class="stat-card"><h3>{total}</h3><p>Total emails</p></div>'
-
-    for category, emails in categorized_emails.items():
-        if emails:
-            emoji = category.split()[0]
-            name = ' '.join(category.split()[1:])
-            html += f'<div class="stat-card"><h3>{len(emails)}</h3><p>{emoji} {name}</p></div>'
-
-    html += "</div>"
-
-    # Catégories et emails
-    category_classes = {
-        "✅ ACCEPTÉ": "accepted",
-        "❌ REFUSÉ": "refused",
-        "📞 ENTRETIEN": "interview",
-        "📝 TEST": "test"
-    }
-
-    for category, emails in categorized_emails.items():
-        css_class = ""
-        for key, cls in category_classes.items():
-            if key in category:
-                css_class = cls
-                break
-
-        html += f"""
-    <div class="category">
-        <div class="category-header">
+_STAT_CARD = '<div class="stat-card"><h3>{count}</h3><p>{label}</p></div>'.format
+
+_CATEGORY_START = """
+    <details class="category" open>
+        <summary class="category-header">
             <h2>{category}</h2>
-            <span class="count">{len(emails)}</span>
-        </div>
+            <span class="count">{count}</span>
+        </summary>
         <div class="email-list">
+""".format
+
+_CATEGORY_END = """
+        </div>
+    </details>
+"""
+
+_PAGE_START = """
+            <details class="page">
+                <summary>📄 Emails {first} à {last} sur {count}</summary>
+""".format
+
+_PAGE_END = """
+            </details>
 """
 
-        if emails:
-            for email in emails:
-                html += f"""
+_LINK = '<a href="{url}" target="_blank" rel="noopener noreferrer">🔗 Voir l\'offre {num}</a>'.format
+
+_NO_EMAILS = '<p class="no-emails">Aucun email dans cette catégorie</p>'
+
+_FOOTER = """
+    <p class="generated">Rapport généré le {generated}</p>
+</body>
+</html>
+""".format
+
+CATEGORY_CLASSES = {
+    "✅ ACCEPTÉ": "accepted",
+    "❌ REFUSÉ": "refused",
+    "📞 ENTRETIEN": "interview",
+    "📝 TEST": "test"
+}
+
+
+def _category_class(category):
+    """Classe CSS de la bordure des emails d'une catégorie"""
+    for key, cls in CATEGORY_CLASSES.items():
+        if key in category:
+            return cls
+    return ""
+
+
+def _render_email(email, css_class):
+    """Bloc HTML d'un email, tous champs échappés"""
+    date = email.get('date')
+    links_html = ''
+    links = email.get('liens')
+    if links:
+        links_html = '<div class="email-links">' + ''.join(
+            _LINK(url=escape(url), num=i) for i, url in enumerate(links[:3], 1)
+        ) + '</div>'
+    return f"""
             <div class="email-item {css_class}">
                 <div class="email-meta">
-                    <span>📬 {email.get('compte', 'N/A')}</span>
-                    <span>📅 {email.get('date', 'N/A')[:16] if email.get('date') else 'N/A'}</span>
+                    <span>📬 {escape(email.get('compte') or 'N/A')}</span>
+                    <span>📅 {escape(date[:16]) if date else 'N/A'}</span>
                 </div>
-                <div class="email-sender">📧 De: {email.get('de', 'Inconnu')}</div>
-                <div class="email-subject">📝 {email.get('objet', 'Sans objet')}</div>
-"""
+                <div class="email-sender">📧 De: {escape(email.get('de') or 'Inconnu')}</div>
+                <div class="email-subject">📝 {escape(email.get('objet') or 'Sans objet')}</div>
+{links_html}</div>"""
 
-                links = email.get('liens', [])
-                if links:
-                    html += '<div class="email-links">'
-                    for i, link in enumerate(links[:3]):
-                        html += f'<a href="{link}" target="_blank">🔗 Voir l\'offre {i+1}</a>'
-                    html += '</div>'
 
-                html += "</div>"
-        else:
-            html += '<p class="no-emails">Aucun email dans cette catégorie</p>'
+def _write_category(write, category, emails, page_size):
+    """Écrit une catégorie : sa première page affichée, les suivantes repliées"""
+    write(_CATEGORY_START(category=escape(category), count=len(emails)))
 
-        html += """
-        </div>
-    </div>
-"""
+    if not emails:
+        write(_NO_EMAILS)
+    css_class = _category_class(category)
+    for start in range(0, len(emails), page_size):
+        page = emails[start:start + page_size]
+        if start:
+            write(_PAGE_START(first=start + 1, last=start + len(page), count=len(emails)))
+        write(''.join(_render_email(email, css_class) for email in page))
+        if start:
+            write(_PAGE_END)
+
+    write(_CATEGORY_END)
 
-    html += f"""
-    <p class="generated">Rapport généré le {datetime.now().strftime('%d/%m/%Y à %H:%M')}</p>
-</body>
-</html>
-"""
 
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html)
+def generate_html_report(categorized_emails, output_file="rapport_emploi.html",
+                         page_size=REPORT_PAGE_SIZE):
+    """Génère un rapport HTML avec liens cliquables"""
+    with open(output_file, 'w', encoding='utf-8', buffering=WRITE_BUFFER) as f:
+        write = f.write
+        write(_HEADER)
+
+        # Statistiques
+        total = sum(len(emails) for emails in categorized_emails.values())
+        write(_STAT_CARD(count=total, label="Total emails"))
+        for category, emails in categorized_emails.items():
+            if emails:
+                write(_STAT_CARD(count=len(emails), label=escape(category)))
+        write("</div>")
+
+        # Catégories et emails
+        for category, emails in categorized_emails.items():
+            _write_category(write, category, emails, page_size)
+
+        write(_FOOTER(generated=datetime.now().strftime('%d/%m/%Y à %H:%M')))
 
     print(f"\n📄 Rapport HTML généré: {output_file}")
     return output_file
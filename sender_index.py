@@ -0,0 +1,63 @@
+"""
+Index des expéditeurs bloqués : recherche par adresse et par domaine en O(1)
+"""
+
+import re
+
+# Caractères d'une adresse ou d'un domaine ; les autres entrées sont des motifs
+_ADDRESS_CHARS_RE = re.compile(r'^[a-z0-9._%+\-@]+$')
+
+
+class SenderIndex:
+    """Compile une liste d'expéditeurs bloqués en ensembles de recherche.
+
+    Chaque entrée est rangée selon sa forme :
+    - « nom@domaine » : adresse, éventuellement suivie d'autres libellés
+      (« ekez.fa.sender@workflow.mail » bloque ekez.fa.sender@workflow.mail.oracle.com) ;
+    - « domaine » ou « nom » : suite de libellés du domaine de l'expéditeur
+      (« zara.com » bloque news.zara.com, « sony » bloque etmail.sony.fr) ;
+    - « nom@ » et toute autre forme : motif recherché dans l'adresse.
+
+    Seule l'adresse est examinée, jamais le nom affiché de l'expéditeur.
+    """
+
+    def __init__(self, entries):
+        self.addresses = set()
+        self.domains = set()
+        patterns = []
+
+        for entry in entries:
+            entry = entry.strip().lower().lstrip('@')
+            if not entry:
+                continue
+            local, at, domain = entry.rpartition('@')
+            if not _ADDRESS_CHARS_RE.match(entry) or (at and (not local or not domain)):
+                patterns.append(entry)
+            elif at:
+                self.addresses.add(entry)
+            else:
+                self.domains.add(entry)
+
+        self.pattern_re = re.compile('|'.join(map(re.escape, patterns))) if patterns else None
+
+    def matches(self, address):
+        """Vérifie si une adresse (sans nom affiché, en minuscules) est bloquée"""
+        local, at, domain = address.rpartition('@')
+        if at and domain:
+            labels = domain.split('.')
+            count = len(labels)
+
+            # Domaine, domaines parents et toute suite de libellés consécutifs
+            if self.domains:
+                for start in range(count):
+                    for end in range(start + 1, count + 1):
+                        if '.'.join(labels[start:end]) in self.domains:
+                            return True
+
+            # Adresse exacte, ou suivie de sous-domaines
+            if self.addresses:
+                for end in range(1, count + 1):
+                    if local + '@' + '.'.join(labels[:end]) in self.addresses:
+                        return True
+
+        return self.pattern_re is not None and self.pattern_re.search(address) is not None
@@ -0,0 +1,89 @@
+"""
+Cache des classifications : l'entreprise est recalculée à chaque lecture
+
+Usage : python -m unittest discover tests
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import classification_cache
+import filters
+from filters import RuleEngine, classify_batch
+
+EMAIL = {
+    'account': 'perso',
+    'id': 'msg-1',
+    'sender': 'Recrutement <rh@acme-industrie.fr>',
+    'subject': 'Invitation entretien - poste de développeur',
+    'date': 'Mon, 02 Mar 2026 10:00:00 +0100',
+    'body': "Bonjour, nous souhaitons vous rencontrer pour un entretien la semaine prochaine.",
+}
+
+
+class ClassificationCacheCompanyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.company_file = os.path.join(self.directory.name, 'company_cache.json')
+        self.saved = (filters._engine, classification_cache._cache,
+                      classification_cache.CLASSIFICATION_CACHE_ENABLED,
+                      classification_cache.CLASSIFICATION_CACHE_FILE)
+        classification_cache.CLASSIFICATION_CACHE_ENABLED = True
+        classification_cache.CLASSIFICATION_CACHE_FILE = os.path.join(self.directory.name, 'classification.db')
+        classification_cache._cache = None
+
+    def tearDown(self):
+        if classification_cache._cache is not None:
+            classification_cache._cache.close()
+        (filters._engine, classification_cache._cache,
+         classification_cache.CLASSIFICATION_CACHE_ENABLED,
+         classification_cache.CLASSIFICATION_CACHE_FILE) = self.saved
+        self.directory.cleanup()
+
+    def new_run(self):
+        """Nouvelle exécution : moteur de règles relu avec le cache des entreprises du moment"""
+        filters._engine = RuleEngine(company_cache_file=self.company_file)
+        return filters._engine
+
+    def test_company_learned_after_caching_is_used_on_cache_hit(self):
+        self.new_run()
+        [(promotional, category, summary)] = classify_batch([dict(EMAIL)], threshold=10)
+        self.assertFalse(promotional)
+        self.assertIsNotNone(category)
+        self.assertNotIn('entreprise', summary)
+
+        # Le domaine de l'expéditeur a été associé à une entreprise depuis
+        with open(self.company_file, 'w', encoding='utf-8') as f:
+            json.dump({'entreprises': {'acme-industrie.fr': 'Acme Industrie'}}, f)
+
+        engine = self.new_run()
+        [(_, cached_category, summary)] = classify_batch([dict(EMAIL)], threshold=10)
+        cache = classification_cache.get_classification_cache(engine.fingerprint)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cached_category, category)
+        self.assertEqual(summary.get('entreprise'), 'Acme Industrie')
+
+    def test_cached_company_is_not_reused_once_domain_is_shared(self):
+        with open(self.company_file, 'w', encoding='utf-8') as f:
+            json.dump({'entreprises': {'acme-industrie.fr': 'Acme Industrie'}}, f)
+        self.new_run()
+        [(_, _, summary)] = classify_batch([dict(EMAIL)], threshold=10)
+        self.assertEqual(summary.get('entreprise'), 'Acme Industrie')
+
+        with open(self.company_file, 'w', encoding='utf-8') as f:
+            json.dump({'partages': ['acme-industrie.fr']}, f)
+
+        engine = self.new_run()
+        [(_, _, summary)] = classify_batch([dict(EMAIL)], threshold=10)
+        self.assertEqual(classification_cache.get_classification_cache(engine.fingerprint).hits, 1)
+        self.assertNotIn('entreprise', summary)
+
+
+if __name__ == "__main__":
+    unittest.main()
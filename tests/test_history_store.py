@@ -0,0 +1,133 @@
+"""
+Historique : enregistrement, mise à jour et recherche plein texte
+
+Usage : python -m unittest discover tests
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import history_store
+from filters import EmailRecord
+from history_store import HistoryStore
+
+CATEGORY = "📞 ENTRETIEN"
+
+
+def _email(msg_id, subject, date, sender='Recrutement <rh@capgemini.com>', company='Capgemini'):
+    """(email, résumé) tels que les enregistre une exécution"""
+    email = EmailRecord({'account': 'perso', 'id': msg_id, 'sender': sender, 'subject': subject,
+                         'date': date, 'body': ''})
+    summary = {'compte': 'perso', 'de': sender, 'objet': subject, 'date': date, 'liens': [], 'num': 1}
+    if company:
+        summary['entreprise'] = company
+    return email, summary
+
+
+class HistoryStoreSearchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'history.db')
+        self.store = HistoryStore(self.path)
+        self.run_id = self.store.start_run()
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def record(self, msg_id, subject, date, body='', **fields):
+        email, summary = _email(msg_id, subject, date, **fields)
+        self.store.record(self.run_id, email, CATEGORY, summary, body)
+
+    def subjects(self, text):
+        terms, since = history_store.parse_search_query(text)
+        results, _ = self.store.search(terms, since)
+        return [result['objet'] for result in results]
+
+    def test_search_matches_subject_company_and_body(self):
+        self.record('1', 'Invitation entretien', 'Mon, 02 Mar 2026 10:00:00 +0100')
+        self.record('2', 'Votre candidature', 'Tue, 03 Mar 2026 10:00:00 +0100', company=None,
+                    sender='Thales <jobs@thalesgroup.com>', body="Poste d'ingénieur systèmes embarqués")
+
+        self.assertEqual(self.subjects('capgem'), ['Invitation entretien'])
+        self.assertEqual(self.subjects('ingenieur embarques'), ['Votre candidature'])
+        self.assertEqual(self.subjects('inexistant'), [])
+
+    def test_rerecording_an_email_does_not_duplicate_it(self):
+        self.record('1', 'Invitation entretien', 'Mon, 02 Mar 2026 10:00:00 +0100', body='premier corps')
+        self.record('1', 'Invitation entretien modifiée', 'Wed, 04 Mar 2026 10:00:00 +0100', body='second corps')
+
+        self.assertEqual(self.subjects('entretien'), ['Invitation entretien modifiée'])
+        self.assertEqual(self.subjects('premier'), [])
+        self.assertEqual(self.subjects('second'), ['Invitation entretien modifiée'])
+
+    def test_since_excludes_older_emails(self):
+        self.record('1', 'Entretien de février', 'Fri, 27 Feb 2026 10:00:00 +0100')
+        self.record('2', 'Entretien de mars', 'Mon, 02 Mar 2026 10:00:00 +0100')
+
+        self.assertEqual(self.subjects('entretien depuis:2026-03'), ['Entretien de mars'])
+        self.assertEqual(sorted(self.subjects('entretien since:2026')),
+                         ['Entretien de février', 'Entretien de mars'])
+
+    def test_more_relevant_email_ranks_first(self):
+        self.record('1', 'Votre candidature', 'Mon, 02 Mar 2026 10:00:00 +0100', company=None,
+                    body='Nous avons bien reçu votre candidature pour le poste chez Capgemini')
+        self.record('2', 'Entretien Capgemini', 'Mon, 02 Mar 2026 11:00:00 +0100', company='Capgemini')
+
+        self.assertEqual(self.subjects('capgemini'), ['Entretien Capgemini', 'Votre candidature'])
+
+    def test_truncated_search_keeps_most_recent_emails_by_date(self):
+        saved = history_store.SEARCH_MAX_CANDIDATES
+        history_store.SEARCH_MAX_CANDIDATES = 2
+        self.addCleanup(setattr, history_store, 'SEARCH_MAX_CANDIDATES', saved)
+
+        # Enregistrés dans le désordre : un rattrapage ajoute des emails anciens après les récents
+        self.record('1', 'Entretien de mars', 'Mon, 02 Mar 2026 10:00:00 +0100')
+        self.record('2', 'Entretien de janvier', 'Mon, 05 Jan 2026 10:00:00 +0100')
+        self.record('3', 'Entretien de février', 'Mon, 02 Feb 2026 10:00:00 +0100')
+        self.record('4', 'Entretien sans date', '')
+
+        results, truncated = self.store.search(['entretien'])
+        self.assertTrue(truncated)
+        self.assertEqual(sorted(result['objet'] for result in results),
+                         ['Entretien de février', 'Entretien de mars'])
+
+        results, truncated = self.store.search(['entretien'], since='2026-02')
+        self.assertFalse(truncated)
+        self.assertEqual(len(results), 2)
+
+    def test_previous_index_is_migrated_with_its_bodies(self):
+        self.store.close()
+        os.remove(self.path)
+        conn = sqlite3.connect(self.path)
+        conn.executescript("""
+            CREATE TABLE emails (
+                account TEXT NOT NULL, id TEXT NOT NULL, category TEXT NOT NULL, sender TEXT,
+                sender_domain TEXT, company TEXT, subject TEXT, date TEXT, date_iso TEXT, links TEXT,
+                first_seen_run INTEGER NOT NULL, last_seen_run INTEGER NOT NULL, PRIMARY KEY (account, id)
+            );
+            CREATE VIRTUAL TABLE emails_fts USING fts5(
+                subject, sender, company, body, tokenize = 'unicode61 remove_diacritics 2'
+            );
+            INSERT INTO emails VALUES ('perso', '1', 'x', 'rh@acme.fr', 'acme.fr', 'Acme',
+                                       'Votre candidature', '', '2026-03-02T10:00:00+01:00', '[]', 1, 1);
+            INSERT INTO emails_fts (rowid, subject, sender, company, body)
+            VALUES (1, 'Votre candidature', 'rh@acme.fr', 'Acme', 'poste de développeur');
+        """)
+        conn.commit()
+        conn.close()
+
+        self.store = HistoryStore(self.path)
+        self.assertEqual(self.subjects('developpeur'), ['Votre candidature'])
+        tables = {name for (name,) in self.store._connection().execute("SELECT name FROM sqlite_master")}
+        self.assertNotIn('emails_fts', tables)
+
+
+if __name__ == "__main__":
+    unittest.main()
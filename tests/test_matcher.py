@@ -0,0 +1,77 @@
+"""
+KeywordMatcher : l'automate d'Aho-Corasick et la recherche mot-clé par
+mot-clé donnent les mêmes résultats
+
+Usage : python -m unittest discover tests
+"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import CATEGORIES, PROMO_KEYWORDS
+from matcher import KeywordMatcher
+
+# Mots-clés qui se chevauchent, partagent un préfixe ou sont inclus les uns dans les autres
+OVERLAPPING_KEYWORDS = [
+    "he", "she", "his", "hers", "entretien", "entretien visio", "entre", "tien",
+    "offre", "offres", "offre d'emploi", "aaa", "aa", "a", "ab", "bab", "abab",
+    "code promo", "promo", "-50%", "50%",
+]
+
+TEXTS = [
+    "",
+    "ushers",
+    "aaaa bababab",
+    "invitation entretien visio pour l'offre d'emploi",
+    "votre code promo -50% sur les offres",
+    "rien à signaler",
+    "entretien entre tien",
+]
+
+
+def _matchers(keywords):
+    """(automate, recherche mot-clé par mot-clé) pour les mêmes mots-clés"""
+    automaton = KeywordMatcher(keywords, min_automaton_keywords=0)
+    scan = KeywordMatcher(keywords, min_automaton_keywords=len(keywords) + 1)
+    return automaton, scan
+
+
+class KeywordMatcherModesTest(unittest.TestCase):
+
+    def assert_same_results(self, keywords, texts):
+        automaton, scan = _matchers(keywords)
+        self.assertTrue(automaton.use_automaton)
+        self.assertFalse(scan.use_automaton)
+        for text in texts:
+            with self.subTest(text=text):
+                self.assertEqual(automaton.find_all(text), scan.find_all(text))
+                self.assertEqual(automaton.find_first(text), scan.find_first(text))
+
+    def test_overlapping_and_prefix_sharing_keywords(self):
+        self.assert_same_results(OVERLAPPING_KEYWORDS, TEXTS)
+
+    def test_ushers_finds_every_overlapping_keyword(self):
+        automaton, _ = _matchers(OVERLAPPING_KEYWORDS)
+        found = {OVERLAPPING_KEYWORDS[i] for i in automaton.find_all("ushers")}
+        self.assertEqual(found, {"he", "she", "hers"})
+
+    def test_empty_keyword_always_matches(self):
+        self.assert_same_results(["", "offre"], TEXTS)
+
+    def test_shipped_keyword_lists_on_random_texts(self):
+        category_keywords = [keyword for category in CATEGORIES.values() for keyword in category['keywords']]
+        keywords = [keyword.lower() for keyword in PROMO_KEYWORDS + category_keywords]
+        rng = random.Random(0)
+        texts = [
+            ' '.join(rng.choice(keywords + ['bonjour', 'merci', 'candidature']) for _ in range(8))[:200]
+            for _ in range(200)
+        ]
+        self.assert_same_results(keywords, texts + TEXTS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+SenderIndex : expéditeurs bloqués par adresse, par domaine et par motif
+
+Usage : python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import BLOCKED_SENDERS
+from filters import RuleEngine
+from sender_index import SenderIndex
+
+
+class SenderIndexTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.index = SenderIndex(BLOCKED_SENDERS)
+
+    def assert_blocked(self, *addresses):
+        for address in addresses:
+            with self.subTest(address=address):
+                self.assertTrue(self.index.matches(address))
+
+    def assert_not_blocked(self, *addresses):
+        for address in addresses:
+            with self.subTest(address=address):
+                self.assertFalse(self.index.matches(address))
+
+    def test_exact_address(self):
+        self.assert_blocked('noreply@glassdoor.com', 'info@linkedin.com')
+        # Seule l'adresse bloquée l'est, pas tout son domaine
+        self.assert_not_blocked('recruteur@glassdoor.com', 'jobs-noreply@linkedin.com')
+
+    def test_address_followed_by_subdomains(self):
+        self.assert_blocked('ekez.fa.sender@workflow.mail', 'ekez.fa.sender@workflow.mail.oracle.com')
+        self.assert_not_blocked('other.sender@workflow.mail.oracle.com')
+
+    def test_domain_and_parent_domains(self):
+        self.assert_blocked('offres@zara.com', 'news@news.zara.com', 'x@etmail.sony.fr', 'x@sony.com')
+
+    def test_lookalikes_are_not_blocked(self):
+        self.assert_not_blocked(
+            'sonya@gmail.com', 'contact@sonyasoft.fr', 'rh@notzara.com', 'jobs@hm.company.fr'
+        )
+
+    def test_local_part_patterns(self):
+        self.assert_blocked('newsletter@acme.fr', 'promo@boutique.fr', 'jobnotification@ats.io')
+        self.assert_not_blocked('recrutement@acme.fr')
+
+    def test_display_name_is_ignored(self):
+        engine = RuleEngine()
+        email = {'sender': 'Sony <recrutement@acme.fr>', 'subject': 'Votre candidature', 'body': ''}
+        self.assertFalse(engine.is_promotional(email))
+        email = {'sender': 'Acme <news@etmail.sony.fr>', 'subject': 'Votre candidature', 'body': ''}
+        self.assertTrue(engine.is_promotional(email))
+
+
+if __name__ == "__main__":
+    unittest.main()